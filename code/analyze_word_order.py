@@ -12,9 +12,9 @@
 from pathlib import Path
 
 # ローカルモジュールからインポート
+from cache import fingerprint_files
 from data_loader import (
-    load_sentences_upos,
-    load_sentences_deprel,
+    load_processed_sentences,
     load_sentences_phrase_heads,
 )
 from word_order import (
@@ -26,8 +26,9 @@ from word_order import (
 from visualization import (
     plot_heatmap,
     plot_dendrogram,
-    plot_mds,
-    plot_tsne,
+    compute_mds,
+    compute_tsne,
+    render_scatter,
     save_distance_matrix_csv,
 )
 
@@ -37,7 +38,8 @@ def analyze_levenshtein(
     results_dir: Path,
     viz_dir: Path,
     tag_type: str,
-    title_label: str
+    title_label: str,
+    input_hash: str = None
 ):
     """
     レーベンシュタイン距離分析を実行
@@ -48,13 +50,18 @@ def analyze_levenshtein(
         viz_dir: 可視化保存ディレクトリ
         tag_type: タグ種類（upos, deprel, phrase_head）
         title_label: タイトル用ラベル
+        input_hash: 入力ファイルのフィンガープリント（指定時は距離行列をキャッシュ）
     """
     print(f"\n{'=' * 80}")
     print(f"【{title_label}でのレーベンシュタイン距離分析】")
     print("=" * 80)
     
     print("\n言語間距離の計算...")
-    distance_matrix, languages = calculate_pairwise_levenshtein(lang_sentences)
+    distance_matrix, languages = calculate_pairwise_levenshtein(
+        lang_sentences,
+        cache_dir=results_dir / ".cache",
+        cache_key=f"{tag_type}_{input_hash}" if input_hash else None
+    )
     
     # CSV保存
     save_distance_matrix_csv(
@@ -85,17 +92,22 @@ def analyze_levenshtein(
         viz_dir / f"{tag_type}_levenshtein_dendrogram.png"
     )
     
-    plot_mds(
-        distance_matrix, languages,
+    # 埋め込み座標は行列ごとに1回だけ計算し、描画に渡す
+    mds_coords = compute_mds(distance_matrix)
+    render_scatter(
+        mds_coords, languages,
         f"MDS Visualization of Language Distances\n({title_label} Levenshtein)",
-        viz_dir / f"{tag_type}_levenshtein_mds.png"
+        viz_dir / f"{tag_type}_levenshtein_mds.png",
+        'MDS', point_color='steelblue'
     )
     
     if len(languages) > 5:
-        plot_tsne(
-            distance_matrix, languages,
+        tsne_coords = compute_tsne(distance_matrix)
+        render_scatter(
+            tsne_coords, languages,
             f"t-SNE Visualization of Language Distances\n({title_label} Levenshtein)",
-            viz_dir / f"{tag_type}_levenshtein_tsne.png"
+            viz_dir / f"{tag_type}_levenshtein_tsne.png",
+            't-SNE'
         )
 
 
@@ -115,24 +127,34 @@ def main():
     # ディレクトリ作成
     viz_dir.mkdir(parents=True, exist_ok=True)
     
+    # 入力データが前回から変わっていなければ計算結果をキャッシュから読み込む
+    cache_dir = results_dir / ".cache"
+    input_hash = fingerprint_files(
+        list(processed_dir.glob("*.jsonl")) + list(phrases_dir.glob("*.jsonl"))
+    )
+    
     # データ読み込み
     print("\n1. データ読み込み中...")
-    upos_sentences = load_sentences_upos(processed_dir)
-    deprel_sentences = load_sentences_deprel(processed_dir)
+    processed_sentences = load_processed_sentences(processed_dir)
+    upos_sentences = {lang: d["upos"] for lang, d in processed_sentences.items()}
+    deprel_sentences = {lang: d["deprel"] for lang, d in processed_sentences.items()}
     phrase_head_sentences = load_sentences_phrase_heads(phrases_dir)
     
     print(f"  言語数: {len(upos_sentences)}")
     print(f"  言語: {', '.join(sorted(upos_sentences.keys()))}")
     
     # UPOS列での分析
-    analyze_levenshtein(upos_sentences, results_dir, viz_dir, "upos", "UPOS")
+    analyze_levenshtein(upos_sentences, results_dir, viz_dir, "upos", "UPOS", input_hash)
     
     # DEPREL列での分析
-    analyze_levenshtein(deprel_sentences, results_dir, viz_dir, "deprel", "DEPREL")
+    analyze_levenshtein(deprel_sentences, results_dir, viz_dir, "deprel", "DEPREL", input_hash)
     
     # Phrase Head UPOS列での分析
     if phrase_head_sentences:
-        analyze_levenshtein(phrase_head_sentences, results_dir, viz_dir, "phrase_head", "Phrase Head UPOS")
+        analyze_levenshtein(
+            phrase_head_sentences, results_dir, viz_dir,
+            "phrase_head", "Phrase Head UPOS", input_hash
+        )
     
     # n-gram分析
     print(f"\n{'=' * 80}")
@@ -140,7 +162,9 @@ def main():
     print("=" * 80)
     
     print("\nUPOS n-gram分析...")
-    upos_ngram_results = analyze_ngrams_all_languages(upos_sentences)
+    upos_ngram_results = analyze_ngrams_all_languages(
+        upos_sentences, cache_dir=cache_dir, cache_key=f"upos_{input_hash}"
+    )
     save_ngram_results(upos_ngram_results, results_dir, tag_type="upos")
     
     print("\n各言語のトップ3 bi-gram（UPOS）:")
@@ -150,12 +174,16 @@ def main():
         print(f"  {lang:15s}: {', '.join(patterns)}")
     
     print("\nDEPREL n-gram分析...")
-    deprel_ngram_results = analyze_ngrams_all_languages(deprel_sentences)
+    deprel_ngram_results = analyze_ngrams_all_languages(
+        deprel_sentences, cache_dir=cache_dir, cache_key=f"deprel_{input_hash}"
+    )
     save_ngram_results(deprel_ngram_results, results_dir, tag_type="deprel")
     
     if phrase_head_sentences:
         print("\nPhrase Head n-gram分析...")
-        phrase_head_ngram_results = analyze_ngrams_all_languages(phrase_head_sentences)
+        phrase_head_ngram_results = analyze_ngrams_all_languages(
+            phrase_head_sentences, cache_dir=cache_dir, cache_key=f"phrase_head_{input_hash}"
+        )
         save_ngram_results(phrase_head_ngram_results, results_dir, tag_type="phrase_head")
     
     # 完了
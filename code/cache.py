@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ディスクキャッシュモジュール
+
+入力データが変わっていない再実行時に、重い計算結果をディスクから読み込むための
+ユーティリティを提供します。
+"""
+
+import hashlib
+import pickle
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+
+# キャッシュの形式を変更したら上げる（古いキャッシュは自動的に使われなくなる）
+CACHE_VERSION = 2
+
+
+def fingerprint_files(paths: Iterable[Path]) -> str:
+    """
+    入力ファイル群のフィンガープリントを計算
+
+    ファイル名・サイズ・更新時刻（ns）から計算するため、内容を読まずに済む。
+
+    Args:
+        paths: 入力ファイルのパス
+
+    Returns:
+        16進数のハッシュ文字列
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{CACHE_VERSION}".encode())
+
+    for path in sorted(paths):
+        stat = path.stat()
+        h.update(f"{path.name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+
+    return h.hexdigest()
+
+
+def disk_cached(key_fn: Callable[..., str]) -> Callable:
+    """
+    関数の戻り値をpickleでディスクにキャッシュするデコレータ
+
+    デコレートした関数はキーワード引数 cache_dir, cache_key を追加で受け取る。
+    両方が指定された場合のみキャッシュを使い、ファイル名は
+    「{cache_key}_{関数名}_{key_fn(...)}.pkl」となる。
+
+    Args:
+        key_fn: 関数と同じ引数を受け取り、結果に影響するパラメータを表す文字列を返す関数
+
+    Example:
+        >>> @disk_cached(lambda data, n=2: f"n{n}")
+        ... def heavy(data, n=2): ...
+        >>> heavy(data, cache_dir=Path('.cache'), cache_key='upos_abcd')
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(
+            *args: Any,
+            cache_dir: Optional[Path] = None,
+            cache_key: Optional[str] = None,
+            **kwargs: Any
+        ) -> Any:
+            if cache_dir is None or cache_key is None:
+                return func(*args, **kwargs)
+
+            cache_path = cache_dir / f"{cache_key}_{func.__name__}_{key_fn(*args, **kwargs)}.pkl"
+
+            if cache_path.exists():
+                print(f"  キャッシュを使用: {cache_path.name}")
+                with open(cache_path, 'rb') as f:
+                    return pickle.load(f)
+
+            result = func(*args, **kwargs)
+
+            # 書き込み途中のファイルを読まないよう、一時ファイル経由で保存
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(cache_path)
+
+            return result
+
+        return wrapper
+
+    return decorator
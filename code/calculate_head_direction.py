@@ -19,13 +19,22 @@ Universal Dependencies (UD) の係り受け構造を用い、言語ごとに
 - Universal Dependencies Guidelines: https://universaldependencies.org/
 """
 
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Sequence
+
+from scipy.spatial.distance import squareform
 
 # ローカルモジュールからインポート
-from data_loader import load_all_languages
+from cache import fingerprint_files
+from data_loader import load_all_dependencies
 from head_direction import (
+    LanguagePairCounts,
+    compute_all_pair_counts,
+    compute_all_pair_counts_raw_merged,
     create_feature_vectors,
-    calculate_distance_matrix_cosine,
+    calculate_distance_matrix_cosine_condensed,
     calculate_distance_matrix_euclidean,
     save_head_initial_rates_csv,
     find_most_similar_pairs,
@@ -43,7 +52,10 @@ def run_analysis(
     results_dir: Path,
     viz_dir: Path,
     use_merged: bool,
-    label: str
+    label: str,
+    metrics: Sequence[str] = ("cosine", "euclidean"),
+    pair_counts: LanguagePairCounts = None,
+    input_hash: str = None
 ):
     """
     Head Direction分析を実行
@@ -54,17 +66,29 @@ def run_analysis(
         viz_dir: 可視化保存ディレクトリ
         use_merged: マージモードを使用するか
         label: ラベル（'raw' or 'merged'）
+        metrics: CSVに保存する距離指標（'cosine', 'euclidean'）
+                 可視化には常にコサイン距離を使う
+        pair_counts: このモードのペア集計結果（Noneならここで集計）
+        input_hash: 入力ファイルのフィンガープリント（指定時は特徴行列をキャッシュ）
     """
     print(f"\n{'=' * 80}")
     print(f"【{label.upper()}版】{'（マージ後のカテゴリを使用）' if use_merged else '（元のUPOS/DEPRELを使用）'}")
     print("=" * 80)
     
+    # ペア集計は特徴ベクトル作成とCSV保存で共有する
+    if pair_counts is None:
+        print("\nペア集計中...")
+        pair_counts = compute_all_pair_counts(all_data, use_merged=use_merged)
+    
     print("\n特徴ベクトル作成中...")
     feature_matrix, languages, pairs = create_feature_vectors(
         all_data,
         use_merged=use_merged,
         min_occurrences=50,
-        min_languages=max(1, len(all_data) // 2)
+        min_languages=max(1, len(all_data) // 2),
+        pair_counts=pair_counts,
+        cache_dir=results_dir / ".cache",
+        cache_key=f"head_direction_{input_hash}" if input_hash else None
     )
     
     if len(pairs) == 0:
@@ -77,25 +101,21 @@ def run_analysis(
         all_data,
         results_dir / f"head_direction_rates_{label}.csv",
         use_merged=use_merged,
-        min_occurrences=50
+        min_occurrences=50,
+        pair_counts=pair_counts
     )
     
     # 距離行列計算
     print("\n距離行列計算中...")
     
-    # コサイン距離
-    distance_cosine = calculate_distance_matrix_cosine(feature_matrix)
-    save_distance_matrix_csv(
-        distance_cosine, languages,
-        results_dir / f"head_direction_distance_cosine_{label}.csv"
-    )
+    # コサイン距離（可視化に使うため常に計算）
+    # 凝縮形式は樹形図の linkage にそのまま渡す
+    condensed_cosine = calculate_distance_matrix_cosine_condensed(feature_matrix)
+    distance_cosine = squareform(condensed_cosine)
     
-    # ユークリッド距離
-    distance_euclidean = calculate_distance_matrix_euclidean(feature_matrix)
-    save_distance_matrix_csv(
-        distance_euclidean, languages,
-        results_dir / f"head_direction_distance_euclidean_{label}.csv"
-    )
+    # ユークリッド距離（CSV出力のみで使うため、指定された場合だけ計算）
+    if "euclidean" in metrics:
+        distance_euclidean = calculate_distance_matrix_euclidean(feature_matrix)
     
     # 最も類似している言語ペア
     print(f"\n最も類似している言語ペア Top 10 (コサイン距離, {label}版):")
@@ -103,27 +123,70 @@ def run_analysis(
     for i, (lang1, lang2, dist) in enumerate(top_pairs, 1):
         print(f"  {i:2d}. {lang1:15s} - {lang2:15s}: 距離={dist:.4f}")
     
-    # 可視化
-    print("\n可視化中...")
-    plot_heatmap(
-        distance_cosine, languages,
-        f"Head Direction Distance (Cosine, {label.capitalize()})\nHead-Initial率に基づく言語間距離",
-        viz_dir / f"head_direction_heatmap_cosine_{label}.png"
-    )
-    plot_dendrogram(
-        distance_cosine, languages,
-        f"Hierarchical Clustering (Head Direction, {label.capitalize()})",
-        viz_dir / f"head_direction_dendrogram_{label}.png"
-    )
-    plot_mds(
-        distance_cosine, languages,
-        f"MDS Visualization (Head Direction, {label.capitalize()})",
-        viz_dir / f"head_direction_mds_{label}.png"
+    # CSV保存と可視化
+    # 互いに独立で、PNGエンコードやファイル書き込みの間はGILが解放されるためスレッドで並列に実行する
+    print("\nCSV保存・可視化中...")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = []
+        if "cosine" in metrics:
+            futures.append(executor.submit(
+                save_distance_matrix_csv,
+                distance_cosine, languages,
+                results_dir / f"head_direction_distance_cosine_{label}.csv"
+            ))
+        if "euclidean" in metrics:
+            futures.append(executor.submit(
+                save_distance_matrix_csv,
+                distance_euclidean, languages,
+                results_dir / f"head_direction_distance_euclidean_{label}.csv"
+            ))
+        futures.append(executor.submit(
+            plot_heatmap,
+            distance_cosine, languages,
+            f"Head Direction Distance (Cosine, {label.capitalize()})\nHead-Initial率に基づく言語間距離",
+            viz_dir / f"head_direction_heatmap_cosine_{label}.png"
+        ))
+        futures.append(executor.submit(
+            plot_dendrogram,
+            distance_cosine, languages,
+            f"Hierarchical Clustering (Head Direction, {label.capitalize()})",
+            viz_dir / f"head_direction_dendrogram_{label}.png",
+            condensed=condensed_cosine
+        ))
+        futures.append(executor.submit(
+            plot_mds,
+            distance_cosine, languages,
+            f"MDS Visualization (Head Direction, {label.capitalize()})",
+            viz_dir / f"head_direction_mds_{label}.png"
+        ))
+        
+        # 例外があればここで送出させる
+        for future in futures:
+            future.result()
+
+
+def parse_args():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description="Head Direction分析")
+    parser.add_argument(
+        "--metrics",
+        default="cosine,euclidean",
+        help="CSVに保存する距離指標（カンマ区切り: cosine, euclidean。既定: 両方）"
     )
+    args = parser.parse_args()
+    
+    args.metrics = [m.strip() for m in args.metrics.split(",") if m.strip()]
+    unknown = set(args.metrics) - {"cosine", "euclidean"}
+    if unknown:
+        parser.error(f"未知の距離指標: {', '.join(sorted(unknown))}")
+    
+    return args
 
 
 def main():
     """メイン処理"""
+    args = parse_args()
+    
     print("=" * 80)
     print("Head Direction分析")
     print("（係り受けの方向性に基づく言語間距離の算出）")
@@ -138,16 +201,35 @@ def main():
     # ディレクトリ作成
     viz_dir.mkdir(parents=True, exist_ok=True)
     
+    # 入力データが前回から変わっていなければペア集計・特徴行列をキャッシュから読み込む
+    input_hash = fingerprint_files(processed_dir.glob("*.jsonl"))
+    
     # データ読み込み
     print("\n1. データ読み込み中...")
-    all_data = load_all_languages(processed_dir)
+    # 集計ループを整数配列で回せるよう、係り受け構造をSoA配列として読み込む
+    # （2回目以降は data/processed/cache からメモリマップで読み込む）
+    all_data = load_all_dependencies(processed_dir)
     print(f"  読み込んだ言語: {', '.join(sorted(all_data.keys()))}")
     
+    # ペア集計（Raw版・Merged版をトークンの1回の走査でまとめて数える）
+    print("\n2. ペア集計中...")
+    raw_counts, merged_counts = compute_all_pair_counts_raw_merged(
+        all_data,
+        cache_dir=results_dir / ".cache",
+        cache_key=f"head_direction_{input_hash}"
+    )
+    
     # Raw版（マージなし）の分析
-    run_analysis(all_data, results_dir, viz_dir, use_merged=False, label="raw")
+    run_analysis(
+        all_data, results_dir, viz_dir, use_merged=False, label="raw",
+        metrics=args.metrics, pair_counts=raw_counts, input_hash=input_hash
+    )
     
     # Merged版（マージあり）の分析
-    run_analysis(all_data, results_dir, viz_dir, use_merged=True, label="merged")
+    run_analysis(
+        all_data, results_dir, viz_dir, use_merged=True, label="merged",
+        metrics=args.metrics, pair_counts=merged_counts, input_hash=input_hash
+    )
     
     # 完了
     print("\n" + "=" * 80)
@@ -3,12 +3,20 @@
 """
 データ読み込みモジュール
 
-各種データファイル（processed JSON, phrases JSONなど）の読み込み機能を提供します。
+各種データファイル（processed JSON Lines, phrases JSON Linesなど）の読み込み機能を提供します。
 """
 
-import json
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterable, Iterator, List, Any, Sequence, Tuple
+
+import numpy as np
+
+from cache import fingerprint_files
+from json_io import dumps, iter_jsonl, read_json
+from utils import get_deprel_base, merge_upos, merge_deprel
 
 
 # ============================================================
@@ -78,106 +86,561 @@ def get_language_name(lang_code: str) -> str:
 
 
 # ============================================================
-# データ読み込み関数
+# タグのIDエンコード
 # ============================================================
+#
+# UPOS/DEPREL/句の主辞UPOSの各タグを1バイトのIDに対応付ける。
+# 文をuint8配列として保持することで、距離計算やn-gram集計で
+# 文字列の比較・ハッシュ計算を行わずに済む。
+# IDは読み込み時に出現順で割り当てる（全タグ種別で共通）。
 
-def load_all_languages(processed_dir: Path) -> Dict[str, List[Dict]]:
+# 255 はn-gram集計で文の区切りに使うため、IDは 0〜254 の範囲
+MAX_TAG_ID = 254
+
+TAG_TO_ID: Dict[str, int] = {}
+ID_TO_TAG: List[str] = []
+
+
+def tag_to_id(tag: str) -> int:
     """
-    全言語のパース済みデータを読み込む
+    タグのIDを取得（未知のタグには新しいIDを割り当てる）
     
     Args:
-        processed_dir: パース済みJSONファイルが格納されたディレクトリ
+        tag: タグ（例: 'NOUN'）
     
     Returns:
-        {言語名: [文データ, ...]} の辞書
-        各文データには 'tokens' キーがあり、トークンのリストを含む
+        タグID（0〜MAX_TAG_ID）
+    """
+    tag_id = TAG_TO_ID.get(tag)
+    if tag_id is None:
+        tag_id = len(ID_TO_TAG)
+        if tag_id > MAX_TAG_ID:
+            raise ValueError(f"タグの種類が多すぎます（最大{MAX_TAG_ID + 1}種類）: {tag}")
+        TAG_TO_ID[tag] = tag_id
+        ID_TO_TAG.append(tag)
+    return tag_id
+
+
+def encode_tags(tags: Sequence[str]) -> np.ndarray:
+    """
+    タグ列をuint8のID配列に変換
     
-    Example:
-        >>> data = load_all_languages(Path('data/processed'))
-        >>> print(data.keys())
-        dict_keys(['Arabic', 'Chinese', 'Czech', ...])
+    Args:
+        tags: タグのリスト（例: ['DET', 'NOUN', 'VERB']）
+    
+    Returns:
+        IDのuint8配列
     """
-    data = {}
+    return np.frombuffer(bytes(tag_to_id(tag) for tag in tags), dtype=np.uint8)
+
+
+def decode_tags(ids: Sequence[int]) -> Tuple[str, ...]:
+    """
+    ID列をタグのタプルに戻す
+    
+    Args:
+        ids: encode_tags で得たID列
+    
+    Returns:
+        タグのタプル
+    """
+    return tuple(ID_TO_TAG[i] for i in ids)
+
+
+class PackedSentences:
+    """
+    1言語分の文をまとめて保持するSoA（Structure of Arrays）形式のコンテナ
+    
+    全文のタグIDを1本のuint8配列 tokens に連結し、各文の開始位置を
+    offsets (文数 + 1,) に持つ。i番目の文は tokens[offsets[i]:offsets[i + 1]]
+    （コピーなしのビュー）で取り出せる。
+    文ごとにリストを持つよりメモリが小さく、連続領域なのでキャッシュ効率も良い。
+    """
+    
+    __slots__ = ("tokens", "offsets")
+    
+    def __init__(self, tokens: np.ndarray, offsets: np.ndarray):
+        self.tokens = tokens
+        self.offsets = offsets
+    
+    @classmethod
+    def from_buffer(cls, buffer: bytearray, offsets: List[int]) -> "PackedSentences":
+        """
+        連結済みのID列と開始位置のリストから作成
+        """
+        return cls(np.frombuffer(buffer, dtype=np.uint8), np.array(offsets, dtype=np.int32))
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, i: int) -> np.ndarray:
+        return self.tokens[self.offsets[i]:self.offsets[i + 1]]
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+# ============================================================
+# 係り受け構造のSoAエンコード（Head Direction分析用）
+# ============================================================
+#
+# 1言語分の全トークンを、トークン位置で揃えた複数のint32配列で表す。
+# タグは種別ごとの語彙でIDに変換し、集計カーネルは整数だけを扱えばよい。
+# マージ後のカテゴリは、マージ前のID → マージ後のID の対応表
+# （merge_lookup_tables）を引くだけで得られる。
+# 語彙 {タグ: ID} のキー順がそのままIDの順になる。
+
+UPOS_VOCAB: Dict[str, int] = {}
+DEPREL_VOCAB: Dict[str, int] = {}
+MERGED_UPOS_VOCAB: Dict[str, int] = {}
+MERGED_DEPREL_VOCAB: Dict[str, int] = {}
+
+
+def _vocab_id(vocab: Dict[str, int], tag: str) -> int:
+    """
+    語彙からタグのIDを取得（未知のタグには新しいIDを割り当てる）
+    """
+    tag_id = vocab.get(tag)
+    if tag_id is None:
+        tag_id = vocab[tag] = len(vocab)
+    return tag_id
+
+
+class DependencyArrays:
+    """
+    1言語分の係り受け構造を保持するSoA形式のコンテナ
     
-    for json_file in sorted(processed_dir.glob("*.json")):
-        with open(json_file, 'r', encoding='utf-8') as f:
-            file_data = json.load(f)
+    各配列の長さは全トークン数で、同じ添字が同じトークンを指す。
+    
+    Attributes:
+        upos: UPOSのID（UPOS_VOCAB、欠損は -1）
+        deprel: サブタイプを除いたDEPRELのID（DEPREL_VOCAB、欠損は -1）
+        head_pos: Headトークンの添字（ROOTや文中に無いHeadは -1）
+    
+    トークンは文中でID昇順に並ぶため、Head-Initial（Head ID < Dep ID）は
+    head_pos[i] < i で判定できる。
+    """
+    
+    __slots__ = ("upos", "deprel", "head_pos")
+    
+    def __init__(self, upos: np.ndarray, deprel: np.ndarray, head_pos: np.ndarray):
+        self.upos = upos
+        self.deprel = deprel
+        self.head_pos = head_pos
+    
+    def __len__(self) -> int:
+        return len(self.head_pos)
+
+
+def encode_dependencies(sentences: Iterable[Dict]) -> DependencyArrays:
+    """
+    文のリストを係り受け構造のSoA配列に変換
+    
+    文は1回だけ順に走査するため、sentence_iter の結果をそのまま渡せる。
+    
+    Args:
+        sentences: 文のリストまたはイテレータ（各文は 'tokens' キーを持つ辞書）
+    
+    Returns:
+        DependencyArrays
+    """
+    upos_ids = []
+    deprel_ids = []
+    head_pos = []
+    
+    # ループ内で引く語彙はローカル変数に束縛しておく
+    upos_vocab = UPOS_VOCAB
+    deprel_vocab = DEPREL_VOCAB
+    
+    for sentence in sentences:
+        tokens = sentence.get("tokens", [])
+        start = len(head_pos)
+        n_tokens = len(tokens)
         
-        language = file_data["language"]
-        data[language] = file_data["sentences"]
+        # トークンIDは通常 1..N の連番なので、ID - 1 がそのまま文中の添字になる
+        position = None
+        if any(token["id"] != k for k, token in enumerate(tokens, 1)):
+            position = {token["id"]: start + k for k, token in enumerate(tokens)}
         
-    return data
+        # parse_token_line の出力は必ず upos/deprel/deprel_base/head を持つため、
+        # .get の既定値を使わず添字で取り出す（既知のタグは語彙を1回引くだけ）
+        for token in tokens:
+            upos = token["upos"]
+            if upos:
+                upos_id = upos_vocab.get(upos)
+                upos_ids.append(_vocab_id(upos_vocab, upos) if upos_id is None else upos_id)
+            else:
+                upos_ids.append(-1)
+            
+            if token["deprel"]:
+                deprel_base = token["deprel_base"]
+                deprel_id = deprel_vocab.get(deprel_base)
+                deprel_ids.append(_vocab_id(deprel_vocab, deprel_base) if deprel_id is None else deprel_id)
+            else:
+                deprel_ids.append(-1)
+            
+            head_id = token["head"]
+            if head_id == 0:
+                head_pos.append(-1)
+            elif position is not None:
+                head_pos.append(position.get(head_id, -1))
+            else:
+                head_pos.append(start + head_id - 1 if 1 <= head_id <= n_tokens else -1)
+    
+    return DependencyArrays(
+        np.array(upos_ids, dtype=np.int32),
+        np.array(deprel_ids, dtype=np.int32),
+        np.array(head_pos, dtype=np.int32),
+    )
+
+
+def merge_lookup_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    マージ前のタグID → マージ後のタグID の対応表を作成
+    
+    語彙は読み込みのたびに増えるため、集計の直前に呼び出す。
+    
+    Returns:
+        (UPOS用の対応表, DEPREL用の対応表)
+        それぞれ UPOS_VOCAB / DEPREL_VOCAB のIDを添字とするint32配列で、
+        値は MERGED_UPOS_VOCAB / MERGED_DEPREL_VOCAB のID
+    """
+    upos_to_merged = np.array(
+        [_vocab_id(MERGED_UPOS_VOCAB, merge_upos(tag)) for tag in UPOS_VOCAB],
+        dtype=np.int32
+    )
+    # merge_deprel はサブタイプを除いてから対応付けるため、ベースタグで引いてよい
+    deprel_to_merged = np.array(
+        [_vocab_id(MERGED_DEPREL_VOCAB, merge_deprel(tag)) for tag in DEPREL_VOCAB],
+        dtype=np.int32
+    )
+    return upos_to_merged, deprel_to_merged
+
+
+# DependencyArrays の各配列と、タグIDを割り当てた語彙（head_posは語彙なし）
+_DEPENDENCY_FIELDS: Dict[str, Any] = {
+    "upos": UPOS_VOCAB,
+    "deprel": DEPREL_VOCAB,
+    "head_pos": None,
+}
+
+
+def _save_dependency_cache(arrays: DependencyArrays, language: str, cache_path: Path) -> None:
+    """
+    SoA配列を .npy（全配列を積んだ int32 行列）と語彙の .json に保存
+    
+    タグIDは実行ごとの出現順で決まるため、保存時の語彙も一緒に書き出す。
+    """
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    meta = {
+        "language": language,
+        "vocabs": {
+            field: list(vocab) for field, vocab in _DEPENDENCY_FIELDS.items()
+            if vocab is not None
+        },
+    }
+    
+    # 書き込み途中のファイルを読まないよう、書き込みごとに固有の一時ファイル経由で保存する
+    # 読み込み側は .npy の有無でキャッシュを判定するため、語彙の .json を先に置く
+    with tempfile.NamedTemporaryFile(dir=cache_path.parent, suffix='.tmp', delete=False) as f:
+        f.write(dumps(meta))
+    Path(f.name).replace(cache_path.with_suffix('.json'))
+    
+    with tempfile.NamedTemporaryFile(dir=cache_path.parent, suffix='.tmp', delete=False) as f:
+        np.save(f, np.stack([getattr(arrays, field) for field in _DEPENDENCY_FIELDS]))
+    Path(f.name).replace(cache_path)
 
 
-def load_sentences_upos(processed_dir: Path) -> Dict[str, List[List[str]]]:
+def _load_dependency_cache(cache_path: Path) -> Tuple[str, DependencyArrays]:
     """
-    各言語の文をUPOS列として読み込む
+    _save_dependency_cache で保存したSoA配列をメモリマップで読み込む
+    
+    タグIDは現在の語彙に振り直す（head_pos はメモリマップのまま使う）。
+    
+    Returns:
+        (言語名, DependencyArrays)
+    """
+    meta = read_json(cache_path.with_suffix('.json'))
+    stacked = np.load(cache_path, mmap_mode='r')
+    
+    columns = {}
+    for row, (field, vocab) in zip(stacked, _DEPENDENCY_FIELDS.items()):
+        if vocab is None:
+            columns[field] = row
+            continue
+        # 保存時のID → 現在のID（末尾の要素は欠損値 -1 用）
+        lookup = np.array(
+            [_vocab_id(vocab, tag) for tag in meta["vocabs"][field]] + [-1],
+            dtype=np.int32
+        )
+        columns[field] = lookup[row]
+    
+    return meta["language"], DependencyArrays(**columns)
+
+
+def load_all_dependencies(processed_dir: Path, cache_dir: Path = None) -> Dict[str, DependencyArrays]:
+    """
+    全言語の係り受け構造をSoA配列として読み込む（キャッシュ付き）
+    
+    初回はJSON Linesを1文ずつパースしながら encode_dependencies で変換し、
+    cache_dir に保存する（全文の辞書を同時にメモリに載せない）。
+    変換はファイルごとにプロセス並列で行う。
+    次回以降、ファイルのサイズ・更新時刻が変わっていなければキャッシュを
+    メモリマップで読み込むため、JSONのパースを省略できる。
     
     Args:
-        processed_dir: パース済みJSONファイルが格納されたディレクトリ
+        processed_dir: パース済みJSON Linesファイルが格納されたディレクトリ
+        cache_dir: キャッシュの保存先（Noneなら processed_dir / "cache"）
     
     Returns:
-        {language: [[upos1, upos2, ...], [upos1, ...], ...]}
+        {言語名: DependencyArrays}
     """
+    jsonl_files = sorted(processed_dir.glob("*.jsonl"))
+    
+    # キャッシュの無いファイルは互いに独立なので、プロセス並列で変換してキャッシュに書く
+    # （タグIDはプロセスごとに異なるが、読み込み時に現在の語彙へ振り直される）
+    missing = [f for f in jsonl_files if not _dependency_cache_path(f, cache_dir).exists()]
+    if missing:
+        with ProcessPoolExecutor() as executor:
+            list(executor.map(_build_dependency_cache, missing, repeat(cache_dir)))
+    
     data = {}
     
-    for json_file in sorted(processed_dir.glob("*.json")):
-        with open(json_file, 'r', encoding='utf-8') as f:
-            file_data = json.load(f)
-        
-        language = file_data["language"]
-        sentences = []
-        
-        for sent in file_data["sentences"]:
-            upos_seq = []
-            for token in sent.get("tokens", []):
-                upos = token.get("upos")
-                if upos:
-                    upos_seq.append(upos)
-            if upos_seq:
-                sentences.append(upos_seq)
-        
-        data[language] = sentences
+    for jsonl_file in jsonl_files:
+        language, arrays = _load_dependency_cache(_dependency_cache_path(jsonl_file, cache_dir))
+        data[language] = arrays
     
     return data
 
 
-def load_sentences_deprel(processed_dir: Path) -> Dict[str, List[List[str]]]:
+def _build_dependency_cache(jsonl_file: Path, cache_dir: Path = None) -> None:
+    """
+    ワーカープロセスで1ファイルを読み込み、係り受けキャッシュを保存
+    """
+    language = read_processed_header(jsonl_file)["language"]
+    save_dependency_cache(jsonl_file, language, sentence_iter(jsonl_file), cache_dir)
+
+
+def _dependency_cache_path(jsonl_file: Path, cache_dir: Path = None) -> Path:
+    """
+    processed JSON Linesファイルに対応する係り受けキャッシュのパス
+    
+    キーにはファイルのサイズ・更新時刻とキャッシュ形式のバージョン
+    （cache.CACHE_VERSION）が含まれる。
+    """
+    if cache_dir is None:
+        cache_dir = jsonl_file.parent / "cache"
+    return cache_dir / f"{jsonl_file.stem}_{fingerprint_files([jsonl_file])}.npy"
+
+
+def save_dependency_cache(
+    jsonl_file: Path,
+    language: str,
+    sentences: Iterable[Dict],
+    cache_dir: Path = None
+) -> DependencyArrays:
     """
-    各言語の文をDEPREL列として読み込む（ベースタグのみ）
+    文データをSoA配列に変換し、jsonl_file に対応する係り受けキャッシュとして保存
+    
+    parse_conllu はパース直後のメモリ上の文データをここに渡すため、
+    Head Direction分析の初回実行でもJSONを読み直さずに済む。
     
     Args:
-        processed_dir: パース済みJSONファイルが格納されたディレクトリ
+        jsonl_file: 書き込み済みのprocessed JSON Linesファイル
+        language: 言語名
+        sentences: 文データ（'tokens' キーを持つ辞書）
+        cache_dir: キャッシュの保存先（Noneなら jsonl_file と同じディレクトリの cache）
     
     Returns:
-        {language: [[deprel1, deprel2, ...], ...]}
+        保存したDependencyArrays
     """
-    data = {}
+    cache_path = _dependency_cache_path(jsonl_file, cache_dir)
+    arrays = encode_dependencies(sentences)
+    
+    # 同じ入力ファイルの古いキャッシュを削除
+    key_len = len(cache_path.stem) - len(jsonl_file.stem) - 1
+    for old_path in cache_path.parent.glob(f"{jsonl_file.stem}_{'?' * key_len}.*"):
+        old_path.unlink(missing_ok=True)
+    _save_dependency_cache(arrays, language, cache_path)
+    
+    return arrays
+
+
+# ============================================================
+# データ読み込み関数
+# ============================================================
+#
+# data/processed には言語ごとに JSON Lines ファイル（例: en_pud.jsonl）を置く。
+# 1行目がヘッダ（language, file_path, sentence_count）、2行目以降が1行1文。
+
+def read_processed_header(file_path: Path) -> Dict[str, Any]:
+    """
+    processed JSON Linesファイルのヘッダ行だけを読み込む
+    
+    Args:
+        file_path: JSON Linesファイルのパス
+    
+    Returns:
+        ヘッダの辞書（language, file_path, sentence_count）
+    """
+    return next(iter_jsonl(file_path))
+
+
+def sentence_iter(file_path: Path) -> Iterator[Dict]:
+    """
+    processed JSON Linesファイルの文を1文ずつパースして返す
+    
+    Args:
+        file_path: JSON Linesファイルのパス
+    
+    Yields:
+        文データ（'tokens' キーを持つ辞書）
+    """
+    lines = iter_jsonl(file_path)
+    next(lines, None)  # ヘッダ行を読み飛ばす
+    yield from lines
+
+
+class LangData:
+    """
+    1言語分のパース済みデータと、そこから導出するビュー
+    
+    JSONのパースはファイルごとに1回だけ行い、UPOS列・DEPREL列・係り受けSoA配列は
+    最初にアクセスされたときに raw から作ってキャッシュする。
+    
+    Attributes:
+        language: 言語名
+        raw: 文データのリスト（各文データには 'tokens' キーがある）
+    """
+    
+    __slots__ = ("language", "raw", "_tags", "_dependencies")
+    
+    def __init__(self, language: str, raw: List[Dict]):
+        self.language = language
+        self.raw = raw
+        self._tags = None
+        self._dependencies = None
+    
+    @property
+    def upos(self) -> PackedSentences:
+        """UPOS列（タグIDにエンコード済み）"""
+        return self._packed_tags()[0]
     
-    for json_file in sorted(processed_dir.glob("*.json")):
-        with open(json_file, 'r', encoding='utf-8') as f:
-            file_data = json.load(f)
+    @property
+    def deprel(self) -> PackedSentences:
+        """DEPREL列（ベースタグのみ、タグIDにエンコード済み）"""
+        return self._packed_tags()[1]
+    
+    @property
+    def dependencies(self) -> DependencyArrays:
+        """係り受け構造のSoA配列"""
+        if self._dependencies is None:
+            self._dependencies = encode_dependencies(self.raw)
+        return self._dependencies
+    
+    def _packed_tags(self) -> Tuple[PackedSentences, PackedSentences]:
+        """
+        UPOS列とDEPREL列を1回の走査でまとめて作成（作成済みならキャッシュを返す）
+        """
+        if self._tags is not None:
+            return self._tags
         
-        language = file_data["language"]
-        sentences = []
+        upos_ids = bytearray()
+        upos_offsets = [0]
+        deprel_ids = bytearray()
+        deprel_offsets = [0]
         
-        for sent in file_data["sentences"]:
-            deprel_seq = []
+        for sent in self.raw:
             for token in sent.get("tokens", []):
+                upos = token.get("upos")
+                if upos:
+                    upos_ids.append(tag_to_id(upos))
                 deprel = token.get("deprel")
                 if deprel:
                     # サブタイプを除去
-                    base_deprel = deprel.split(':')[0]
-                    deprel_seq.append(base_deprel)
-            if deprel_seq:
-                sentences.append(deprel_seq)
+                    deprel_ids.append(tag_to_id(get_deprel_base(token)))
+            # 空の文は追加しない
+            if len(upos_ids) > upos_offsets[-1]:
+                upos_offsets.append(len(upos_ids))
+            if len(deprel_ids) > deprel_offsets[-1]:
+                deprel_offsets.append(len(deprel_ids))
         
-        data[language] = sentences
+        self._tags = (
+            PackedSentences.from_buffer(upos_ids, upos_offsets),
+            PackedSentences.from_buffer(deprel_ids, deprel_offsets),
+        )
+        return self._tags
+
+
+def load_all(processed_dir: Path) -> Dict[str, LangData]:
+    """
+    全言語のパース済みデータを読み込む（各ファイルのパースは1回だけ）
+    
+    Args:
+        processed_dir: パース済みJSON Linesファイルが格納されたディレクトリ
+    
+    Returns:
+        {言語名: LangData} の辞書
+    
+    Example:
+        >>> data = load_all(Path('data/processed'))
+        >>> upos_sentences = {lang: d.upos for lang, d in data.items()}
+    """
+    data = {}
+    
+    for jsonl_file in sorted(processed_dir.glob("*.jsonl")):
+        lines = iter_jsonl(jsonl_file)
+        language = next(lines)["language"]
+        data[language] = LangData(language, list(lines))
     
     return data
 
 
-def load_sentences_phrase_heads(phrases_dir: Path) -> Dict[str, List[List[str]]]:
+def load_all_languages(processed_dir: Path) -> Dict[str, List[Dict]]:
+    """
+    全言語のパース済みデータを読み込む
+    
+    Args:
+        processed_dir: パース済みJSON Linesファイルが格納されたディレクトリ
+    
+    Returns:
+        {言語名: [文データ, ...]} の辞書
+        各文データには 'tokens' キーがあり、トークンのリストを含む
+    
+    Example:
+        >>> data = load_all_languages(Path('data/processed'))
+        >>> print(data.keys())
+        dict_keys(['Arabic', 'Chinese', 'Czech', ...])
+    """
+    return {language: lang_data.raw for language, lang_data in load_all(processed_dir).items()}
+
+
+def load_processed_sentences(processed_dir: Path) -> Dict[str, Dict[str, PackedSentences]]:
+    """
+    各言語の文をUPOS列とDEPREL列として読み込む
+    
+    各ファイルを1回だけ開き、UPOSとDEPREL（ベースタグのみ）を同時に取り出す。
+    
+    Args:
+        processed_dir: パース済みJSON Linesファイルが格納されたディレクトリ
+    
+    Returns:
+        {language: {"upos": PackedSentences, "deprel": PackedSentences}}
+        （タグIDにエンコード済み）
+    
+    Example:
+        >>> data = load_processed_sentences(Path('data/processed'))
+        >>> upos_sentences = {lang: d["upos"] for lang, d in data.items()}
+    """
+    return {
+        language: {"upos": lang_data.upos, "deprel": lang_data.deprel}
+        for language, lang_data in load_all(processed_dir).items()
+    }
+
+
+def load_sentences_phrase_heads(phrases_dir: Path) -> Dict[str, PackedSentences]:
     """
     各言語の文を句の主辞UPOS列として読み込む
     
@@ -185,66 +648,38 @@ def load_sentences_phrase_heads(phrases_dir: Path) -> Dict[str, List[List[str]]]
         phrases_dir: phrasesディレクトリのパス
     
     Returns:
-        {language: [[head_upos1, head_upos2, ...], ...]}
+        {language: PackedSentences}（主辞UPOSをタグIDにエンコード済み）
     """
     data = {}
     
     # PUD形式とその他の形式に対応
-    for pattern in ["*_pud_phrases.json", "*_phrases.json"]:
-        for json_file in sorted(phrases_dir.glob(pattern)):
+    for pattern in ["*_pud_phrases.jsonl", "*_phrases.jsonl"]:
+        for jsonl_file in sorted(phrases_dir.glob(pattern)):
             # 重複を避ける
-            if json_file.stem.replace("_phrases", "") in [k.lower() for k in data.keys()]:
+            if jsonl_file.stem.replace("_phrases", "") in [k.lower() for k in data.keys()]:
                 continue
-                
-            with open(json_file, 'r', encoding='utf-8') as f:
-                file_data = json.load(f)
             
-            language = file_data["language"]
+            # 1行目がヘッダ、2行目以降が1行1文
+            lines = iter_jsonl(jsonl_file)
+            language = next(lines)["language"]
             
             # 既に読み込み済みならスキップ
             if language in data:
                 continue
             
-            sentences = []
+            head_upos_ids = bytearray()
+            offsets = [0]
             
-            for sent in file_data["sentences"]:
-                head_upos_seq = []
+            for sent in lines:
                 for phrase in sent.get("phrases", []):
                     head_upos = phrase.get("head_upos")
                     if head_upos:
-                        head_upos_seq.append(head_upos)
-                if head_upos_seq:
-                    sentences.append(head_upos_seq)
+                        head_upos_ids.append(tag_to_id(head_upos))
+                # 空の文は追加しない
+                if len(head_upos_ids) > offsets[-1]:
+                    offsets.append(len(head_upos_ids))
             
-            if sentences:
-                data[language] = sentences
+            if len(offsets) > 1:
+                data[language] = PackedSentences.from_buffer(head_upos_ids, offsets)
     
     return data
-
-
-def load_processed_file(file_path: Path) -> Dict[str, Any]:
-    """
-    単一のprocessed JSONファイルを読み込む
-    
-    Args:
-        file_path: JSONファイルのパス
-    
-    Returns:
-        パース済みデータの辞書
-    """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-
-def save_json(data: Dict[str, Any], output_path: Path, indent: int = 2) -> None:
-    """
-    データをJSONファイルとして保存
-    
-    Args:
-        data: 保存するデータ
-        output_path: 出力ファイルパス
-        indent: インデント幅
-    """
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=indent)
@@ -5,7 +5,25 @@ data/zip/ 内の全てのzipファイルを data/raw/ に展開する
 
 import os
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
+from typing import Optional
+
+
+def _extract_one(zip_path: Path, extract_to: Path) -> Optional[str]:
+    """
+    1つのzipファイルを展開する
+    
+    Returns:
+        エラー時はエラーメッセージ、成功時はNone
+    """
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            zip_ref.extractall(extract_to)
+        return None
+    except Exception as e:
+        return str(e)
 
 
 def extract_all_zips():
@@ -26,22 +44,21 @@ def extract_all_zips():
     print("-" * 60)
     
     # 各zipファイルを展開
+    # 展開（zlibの伸長）とディスク書き込みの間はGILが解放されるため、スレッドで並列に処理する
+    zip_files = sorted(zip_files)
     extracted_count = 0
-    for zip_path in sorted(zip_files):
-        print(f"展開中: {zip_path.name}")
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        errors = executor.map(partial(_extract_one, extract_to=raw_dir), zip_files)
         
-        try:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                # 展開先ディレクトリ名を取得
-                extract_to = raw_dir
-                
-                # 展開
-                zip_ref.extractall(extract_to)
+        # 結果はファイル名順に受け取り、ログもその順で出す
+        for zip_path, error in zip(zip_files, errors):
+            print(f"展開中: {zip_path.name}")
+            
+            if error is None:
                 extracted_count += 1
                 print(f"  ✓ 完了: {zip_path.name}")
-                
-        except Exception as e:
-            print(f"  ✗ エラー: {zip_path.name} - {e}")
+            else:
+                print(f"  ✗ エラー: {zip_path.name} - {error}")
     
     print("-" * 60)
     print(f"展開完了: {extracted_count}/{len(zip_files)} ファイル")
@@ -14,16 +14,34 @@ Universal Dependencies (UD) の係り受け構造を用い、言語ごとに
 4. 言語間のベクトル類似度（コサイン類似度・ユークリッド距離）を計算
 """
 
-import csv
+import os
 import numpy as np
+import pandas as pd
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, List, Tuple, Set
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, NamedTuple, Tuple, Set, Union
 
 from scipy.spatial.distance import squareform, pdist
-from sklearn.metrics.pairwise import cosine_similarity
 
-from utils import merge_upos, merge_deprel
+from cache import disk_cached
+from data_loader import (
+    DependencyArrays,
+    encode_dependencies,
+    merge_lookup_tables,
+    UPOS_VOCAB,
+    DEPREL_VOCAB,
+    MERGED_UPOS_VOCAB,
+    MERGED_DEPREL_VOCAB,
+)
+from word_order import find_most_similar_pairs
+
+# Numbaがあればペア集計ループをJITコンパイル版で実行する
+try:
+    import head_direction_numba as _hd_numba
+except ImportError:
+    _hd_numba = None
 
 
 # ============================================================
@@ -35,6 +53,9 @@ PairKey = Tuple[str, str, str]
 # 言語ごとのHead-Initial率: {言語名: {ペアキー: (head_initial_count, total_count)}}
 LanguagePairCounts = Dict[str, Dict[PairKey, Tuple[int, int]]]
 
+# 1言語分の入力: 文リスト、または encode_dependencies で変換済みのSoA配列
+LanguageData = Union[List[Dict], DependencyArrays]
+
 
 # ============================================================
 # Head-Dependentペアの抽出とカウント
@@ -65,52 +86,327 @@ def extract_head_dependent_pairs(
     - 0.0 に近い: Head が Dependent より後に来る（例: 日本語の動詞-目的語）
     - 0.5 付近: 順序が一定しない、または言語内で変動がある
     """
-    pair_counts: Dict[PairKey, List[int]] = defaultdict(lambda: [0, 0])
+    # タグを整数IDに変換し、ペアキーも1つの整数にして配列上で数える
+    # （文字列タプルのハッシュ計算を避ける）
+    return count_head_dependent_pairs(
+        encode_dependencies(sentences),
+        use_merged=use_merged,
+        exclude_punct=exclude_punct
+    )
+
+
+def _count_pairs_np(
+    upos: np.ndarray,
+    deprel: np.ndarray,
+    head_pos: np.ndarray,
+    upos_map: np.ndarray,
+    deprel_map: np.ndarray,
+    punct_id: int,
+    n_upos: int,
+    n_deprel: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    NumPyによるペア集計（Numba未導入時のフォールバック）
+    
+    ペアキー配列を一括で作り、np.bincount で集計する（トークン単位のPythonループなし）。
+    引数と戻り値は head_direction_numba.count_pairs と同じ。
+    """
+    size = n_upos * n_upos * n_deprel
+    
+    # ROOTなど Head を持たないトークンを除外
+    dep_idx = np.flatnonzero(head_pos >= 0)
+    head_idx = head_pos[dep_idx]
+    
+    dep_upos = upos[dep_idx]
+    head_upos = upos[head_idx]
+    dep_deprel = deprel[dep_idx]
     
-    for sentence in sentences:
-        tokens = sentence.get("tokens", [])
-        token_map = {token["id"]: token for token in tokens}
+    # 欠損・PUNCTを含むペアを除外
+    valid = (dep_upos >= 0) & (head_upos >= 0) & (dep_deprel >= 0)
+    valid &= (dep_upos != punct_id) & (head_upos != punct_id)
+    
+    keys = (
+        (upos_map[head_upos[valid]].astype(np.int64) * n_upos + upos_map[dep_upos[valid]]) * n_deprel
+        + deprel_map[dep_deprel[valid]]
+    )
+    head_initial = head_idx[valid] < dep_idx[valid]
+    
+    total_counts = np.bincount(keys, minlength=size).astype(np.int64, copy=False)
+    init_counts = np.bincount(keys[head_initial], minlength=size).astype(np.int64, copy=False)
+    
+    return init_counts, total_counts
+
+
+def _pair_vocabs(use_merged: bool) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    モードに応じた (UPOS語彙, DEPREL語彙) を返す
+    """
+    if use_merged:
+        return MERGED_UPOS_VOCAB, MERGED_DEPREL_VOCAB
+    return UPOS_VOCAB, DEPREL_VOCAB
+
+
+# 集計カーネルに渡す (UPOS対応表, DEPREL対応表, PUNCTのID, UPOS語彙サイズ, DEPREL語彙サイズ)
+KernelParams = Tuple[np.ndarray, np.ndarray, int, int, int]
+
+
+def _count_pair_ids(arrays: DependencyArrays, params: KernelParams) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    SoA配列をID単位で集計し、(head_initial_counts, total_counts) を返す
+    
+    語彙（モジュール変数）に触れないため、ワーカープロセスでも実行できる。
+    """
+    count = _hd_numba.count_pairs if _hd_numba is not None else _count_pairs_np
+    return count(arrays.upos, arrays.deprel, arrays.head_pos, *params)
+
+
+def _decode_pair_counts(
+    init_counts: np.ndarray,
+    total_counts: np.ndarray,
+    use_merged: bool,
+    params: KernelParams
+) -> Dict[PairKey, Tuple[int, int]]:
+    """
+    ID単位の集計結果のうち、出現したキーだけをタグのタプルに戻す
+    
+    キーの平坦化には集計時の語彙サイズ（params）を使う。
+    """
+    upos_vocab, deprel_vocab = _pair_vocabs(use_merged)
+    upos_tags = list(upos_vocab)
+    deprel_tags = list(deprel_vocab)
+    n_upos, n_deprel = params[3], params[4]
+    pair_counts = {}
+    
+    for key in np.flatnonzero(total_counts).tolist():
+        head_dep, deprel = divmod(key, n_deprel)
+        head_upos, dep_upos = divmod(head_dep, n_upos)
+        pair_key = (upos_tags[head_upos], upos_tags[dep_upos], deprel_tags[deprel])
+        pair_counts[pair_key] = (int(init_counts[key]), int(total_counts[key]))
+    
+    return pair_counts
+
+
+def _kernel_params(use_merged: bool, exclude_punct: bool = True) -> KernelParams:
+    """
+    現在の語彙から集計カーネルに渡すパラメータを作成
+    
+    マージ後のカテゴリは、マージ前のIDを対応表で引き直して得る
+    （マージなしの場合は恒等写像）。
+    """
+    if use_merged:
+        upos_map, deprel_map = merge_lookup_tables()
+    else:
+        upos_map = np.arange(len(UPOS_VOCAB), dtype=np.int32)
+        deprel_map = np.arange(len(DEPREL_VOCAB), dtype=np.int32)
+    
+    upos_vocab, deprel_vocab = _pair_vocabs(use_merged)
+    # 句読点判定は常にマージ前のUPOSで行う
+    punct_id = UPOS_VOCAB.get("PUNCT", -1) if exclude_punct else -1
+    return upos_map, deprel_map, punct_id, len(upos_vocab), len(deprel_vocab)
+
+
+def count_head_dependent_pairs(
+    arrays: DependencyArrays,
+    use_merged: bool = False,
+    exclude_punct: bool = True
+) -> Dict[PairKey, Tuple[int, int]]:
+    """
+    SoA配列からHead-Dependentペアを集計する（extract_head_dependent_pairs の高速版）
+    
+    Args:
+        arrays: encode_dependencies で変換した1言語分の配列
+        use_merged: True の場合、マージ後のカテゴリを使用
+        exclude_punct: True の場合、PUNCTを除外
+    
+    Returns:
+        {(HeadUPOS, DepUPOS, DEPREL): (head_initial_count, total_count)}
+    """
+    params = _kernel_params(use_merged, exclude_punct)
+    init_counts, total_counts = _count_pair_ids(arrays, params)
+    return _decode_pair_counts(init_counts, total_counts, use_merged, params)
+
+
+def _count_language(data: LanguageData, use_merged: bool, params: KernelParams):
+    """
+    ワーカープロセスで1言語分を集計
+    
+    DependencyArrays ならID単位の集計配列を、文リストならペア辞書を返す
+    （ID→タグの変換は語彙を持つ親プロセスで行う）。
+    """
+    if isinstance(data, DependencyArrays):
+        return _count_pair_ids(data, params)
+    return extract_head_dependent_pairs(data, use_merged=use_merged)
+
+
+def compute_all_pair_counts(
+    all_language_data: Dict[str, LanguageData],
+    use_merged: bool = False
+) -> LanguagePairCounts:
+    """
+    全言語のHead-Dependentペアを集計（言語ごとにプロセス並列）
+    
+    create_feature_vectors と save_head_initial_rates_csv に同じ結果を渡すことで、
+    コーパスの走査を1モードにつき1回で済ませる。
+    
+    Args:
+        all_language_data: {言語名: 文リスト または DependencyArrays}
+        use_merged: マージ後のカテゴリを使用するかどうか
+    
+    Returns:
+        {言語名: {ペアキー: (head_initial_count, total_count)}}
+    """
+    languages = sorted(all_language_data.keys())
+    params = _kernel_params(use_merged)
+    worker = partial(_count_language, use_merged=use_merged, params=params)
+    
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(
+            worker,
+            [all_language_data[lang] for lang in languages],
+            chunksize=2
+        )
         
-        for token in tokens:
-            head_id = token.get("head", 0)
-            
-            # ROOTは係り受け分析から除外
-            if head_id == 0:
-                continue
-            
-            head_token = token_map.get(head_id)
-            if head_token is None:
-                continue
-            
-            dep_upos = token.get("upos", "")
-            head_upos = head_token.get("upos", "")
-            deprel = token.get("deprel", "")
-            
-            if not dep_upos or not head_upos or not deprel:
-                continue
-            
-            # 句読点を除外（オプション）
-            if exclude_punct and (dep_upos == "PUNCT" or head_upos == "PUNCT"):
-                continue
-            
-            # DEPRELからサブタイプを除去
-            base_deprel = deprel.split(':')[0]
-            
-            # マージが有効な場合、カテゴリを変換
-            if use_merged:
-                head_upos = merge_upos(head_upos)
-                dep_upos = merge_upos(dep_upos)
-                base_deprel = merge_deprel(deprel)
-            
-            pair_key = (head_upos, dep_upos, base_deprel)
-            
-            pair_counts[pair_key][1] += 1  # 総出現回数
-            
-            # Head-Initialの判定
-            if head_token["id"] < token["id"]:
-                pair_counts[pair_key][0] += 1
-    
-    return {k: tuple(v) for k, v in pair_counts.items()}
+        language_pair_counts = {}
+        for lang, result in zip(languages, results):
+            if isinstance(result, tuple):
+                result = _decode_pair_counts(*result, use_merged, params)
+            language_pair_counts[lang] = result
+    
+    return language_pair_counts
+
+
+class RawMergedPairIds(NamedTuple):
+    """
+    1言語分のID単位の集計配列（マージ前・マージ後）
+    
+    ID→タグの変換は語彙を持つ親プロセスで _decode_pair_counts により行う。
+    """
+    raw_init: np.ndarray
+    raw_total: np.ndarray
+    merged_init: np.ndarray
+    merged_total: np.ndarray
+
+
+def _count_pair_ids_raw_merged(
+    arrays: DependencyArrays,
+    merged_params: KernelParams
+) -> "RawMergedPairIds":
+    """
+    SoA配列をマージ前・マージ後の両方でID単位に集計
+    
+    Numbaがあれば1回の走査で両方を数え、無ければマージ前の集計からマージ後を求める。
+    
+    Returns:
+        RawMergedPairIds
+    """
+    upos_map, deprel_map, punct_id, n_merged_upos, n_merged_deprel = merged_params
+    n_upos, n_deprel = len(upos_map), len(deprel_map)
+    
+    if _hd_numba is not None:
+        return RawMergedPairIds(*_hd_numba.count_pairs_raw_merged(
+            arrays.upos, arrays.deprel, arrays.head_pos, upos_map, deprel_map, punct_id,
+            n_upos, n_deprel, n_merged_upos, n_merged_deprel
+        ))
+    
+    raw_params = (
+        np.arange(n_upos, dtype=np.int32), np.arange(n_deprel, dtype=np.int32),
+        punct_id, n_upos, n_deprel
+    )
+    raw_init, raw_total = _count_pair_ids(arrays, raw_params)
+    # マージ後の集計はトークンを再走査せず、マージ前の集計配列から求める
+    return RawMergedPairIds(raw_init, raw_total, *_merge_pair_ids(raw_init, raw_total, merged_params))
+
+
+def _merge_pair_ids(
+    raw_init: np.ndarray,
+    raw_total: np.ndarray,
+    merged_params: KernelParams
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    マージ前のID単位の集計配列を、マージ後のキーに足し合わせる
+    
+    計算量はトークン数ではなくペアキーの数に比例する。
+    
+    Returns:
+        (merged_init, merged_total)
+    """
+    upos_map, deprel_map, _, n_merged_upos, n_merged_deprel = merged_params
+    
+    # マージ前のキー (head, dep, deprel) の並びに対応するマージ後のキー
+    merged_keys = (
+        (upos_map[:, None, None].astype(np.int64) * n_merged_upos + upos_map[None, :, None])
+        * n_merged_deprel + deprel_map[None, None, :]
+    ).ravel()
+    size = n_merged_upos * n_merged_upos * n_merged_deprel
+    
+    return tuple(
+        np.bincount(merged_keys, weights=counts, minlength=size).astype(np.int64)
+        for counts in (raw_init, raw_total)
+    )
+
+
+def _count_language_raw_merged(
+    data: LanguageData,
+    merged_params: KernelParams
+) -> Union[RawMergedPairIds, Tuple[Dict[PairKey, Tuple[int, int]], Dict[PairKey, Tuple[int, int]]]]:
+    """
+    1言語分をマージ前・マージ後の両方で集計
+    
+    DependencyArrays なら RawMergedPairIds を、文リストなら (マージ前, マージ後) のペア辞書を返す。
+    """
+    if isinstance(data, DependencyArrays):
+        return _count_pair_ids_raw_merged(data, merged_params)
+    return (
+        extract_head_dependent_pairs(data, use_merged=False),
+        extract_head_dependent_pairs(data, use_merged=True),
+    )
+
+
+@disk_cached(lambda all_language_data: "all")
+def compute_all_pair_counts_raw_merged(
+    all_language_data: Dict[str, LanguageData]
+) -> Tuple[LanguagePairCounts, LanguagePairCounts]:
+    """
+    全言語のHead-Dependentペアを、マージ前・マージ後の両方で集計
+    
+    compute_all_pair_counts を2回呼ぶのと同じ結果を、トークンの1回の走査で得る。
+    cache_dir, cache_key を指定すると集計結果をディスクにキャッシュする。
+    
+    Args:
+        all_language_data: {言語名: 文リスト または DependencyArrays}
+    
+    Returns:
+        (マージ前の集計結果, マージ後の集計結果)
+        それぞれ {言語名: {ペアキー: (head_initial_count, total_count)}}
+    """
+    languages = sorted(all_language_data.keys())
+    merged_params = _kernel_params(use_merged=True)
+    raw_params = _kernel_params(use_merged=False)
+    worker = partial(_count_language_raw_merged, merged_params=merged_params)
+    
+    raw_counts: LanguagePairCounts = {}
+    merged_counts: LanguagePairCounts = {}
+    
+    data = [all_language_data[lang] for lang in languages]
+    
+    # Numbaのカーネルは1言語を数ミリ秒で集計するため、プロセスの起動と結果の受け渡しの方が
+    # 高くつく。プロセス並列はカーネルを使えない場合（Numbaなし・文リスト入力）に限る
+    if _hd_numba is not None and all(isinstance(d, DependencyArrays) for d in data):
+        results = list(map(worker, data))
+    else:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            results = list(executor.map(worker, data, chunksize=2))
+    
+    for lang, result in zip(languages, results):
+        if isinstance(result, RawMergedPairIds):
+            raw_counts[lang] = _decode_pair_counts(result.raw_init, result.raw_total, False, raw_params)
+            merged_counts[lang] = _decode_pair_counts(
+                result.merged_init, result.merged_total, True, merged_params
+            )
+        else:
+            raw_counts[lang], merged_counts[lang] = result
+    
+    return raw_counts, merged_counts
 
 
 def calculate_head_initial_rates(
@@ -142,28 +438,37 @@ def calculate_head_initial_rates(
 # 言語特徴ベクトルの作成
 # ============================================================
 
+@disk_cached(
+    lambda all_language_data, use_merged=False, min_occurrences=10, min_languages=None, pair_counts=None:
+    f"{'merged' if use_merged else 'raw'}_occ{min_occurrences}_lang{min_languages}"
+)
 def create_feature_vectors(
-    all_language_data: Dict[str, List[Dict]],
+    all_language_data: Dict[str, LanguageData],
     use_merged: bool = False,
     min_occurrences: int = 10,
-    min_languages: int = None
+    min_languages: int = None,
+    pair_counts: LanguagePairCounts = None
 ) -> Tuple[np.ndarray, List[str], List[PairKey]]:
     """
     全言語のHead-Initial率から特徴ベクトル行列を作成
     
     Args:
-        all_language_data: {言語名: 文リスト}
+        all_language_data: {言語名: 文リスト または DependencyArrays}
         use_merged: マージ後のカテゴリを使用するかどうか
         min_occurrences: 各言語でこれ以上出現するペアのみ使用
         min_languages: 最低でもこの数の言語で出現するペアのみ使用
                       （Noneの場合は半数以上の言語で出現するペアのみ）
+        pair_counts: compute_all_pair_counts の結果（Noneならここで集計）
     
     Returns:
         (特徴行列, 言語リスト, ペアキーリスト)
         
-        - 特徴行列: shape = (言語数, ペア数) の numpy配列
+        - 特徴行列: shape = (言語数, ペア数) の numpy配列（float32）
         - 言語リスト: 行に対応する言語名のリスト
         - ペアキーリスト: 列に対応するペアキーのリスト
+    
+    キーワード引数 cache_dir, cache_key を指定すると結果をディスクにキャッシュする
+    （cache.disk_cached を参照）。
     """
     languages = sorted(all_language_data.keys())
     n_languages = len(languages)
@@ -177,14 +482,9 @@ def create_feature_vectors(
     
     # ステップ1: 各言語のペアカウントを取得
     print("  ステップ1: ペア抽出中...")
-    language_pair_counts: Dict[str, Dict[PairKey, Tuple[int, int]]] = {}
-    
-    for lang in languages:
-        pair_counts = extract_head_dependent_pairs(
-            all_language_data[lang],
-            use_merged=use_merged
-        )
-        language_pair_counts[lang] = pair_counts
+    if pair_counts is None:
+        pair_counts = compute_all_pair_counts(all_language_data, use_merged=use_merged)
+    language_pair_counts = pair_counts
     
     # ステップ2: 共通ペアの特定
     print("  ステップ2: 共通ペアの特定中...")
@@ -210,14 +510,22 @@ def create_feature_vectors(
     # ステップ3: 特徴行列の作成
     print("  ステップ3: 特徴行列の作成中...")
     
-    feature_matrix = np.zeros((n_languages, len(common_pairs)))
+    # 出現しないペアは 0.5（中立）
+    # 値は0〜1の比率なのでfloat32で十分（行列積のメモリ転送量が半分になる）
+    feature_matrix = np.full((n_languages, len(common_pairs)), 0.5, dtype=np.float32)
+    pair_to_col = {pair_key: j for j, pair_key in enumerate(common_pairs)}
     
     for i, lang in enumerate(languages):
-        pair_counts = language_pair_counts[lang]
-        rates = calculate_head_initial_rates(pair_counts)
-        
-        for j, pair_key in enumerate(common_pairs):
-            feature_matrix[i, j] = rates.get(pair_key, 0.5)
+        # 言語が持つペアのうち共通ペアに含まれるものだけを列番号に変換してまとめて代入
+        # （Head-Initial率もここで計算し、中間の辞書を作らない）
+        cols = []
+        values = []
+        for pair_key, (head_initial, total) in language_pair_counts[lang].items():
+            j = pair_to_col.get(pair_key)
+            if j is not None:
+                cols.append(j)
+                values.append(head_initial / total if total > 0 else 0.5)
+        feature_matrix[i, cols] = values
     
     return feature_matrix, languages, common_pairs
 
@@ -226,6 +534,30 @@ def create_feature_vectors(
 # 距離行列の計算
 # ============================================================
 
+def calculate_distance_matrix_cosine_condensed(feature_matrix: np.ndarray) -> np.ndarray:
+    """
+    コサイン距離に基づく言語間距離を凝縮形式（上三角のみの1次元配列）で計算
+    
+    linkage にはこの形式をそのまま渡せる。
+    
+    Args:
+        feature_matrix: 特徴行列 (言語数 x ペア数)
+    
+    Returns:
+        凝縮距離 (言語数 * (言語数 - 1) / 2,)、0-1の範囲
+    """
+    # 行をL2正規化してから内積を取る（行列積1回で全ペアの類似度が求まる）
+    norms = np.linalg.norm(feature_matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0  # ゼロベクトルはそのまま（類似度0）
+    normalized = feature_matrix / norms
+    similarity = normalized @ normalized.T
+    
+    rows, cols = np.triu_indices(feature_matrix.shape[0], k=1)
+    condensed = 1 - similarity[rows, cols]
+    
+    return np.clip(condensed, 0, None, out=condensed)
+
+
 def calculate_distance_matrix_cosine(feature_matrix: np.ndarray) -> np.ndarray:
     """
     コサイン距離に基づく言語間距離行列を計算
@@ -236,13 +568,7 @@ def calculate_distance_matrix_cosine(feature_matrix: np.ndarray) -> np.ndarray:
     Returns:
         距離行列 (言語数 x 言語数)、0-1の範囲
     """
-    similarity = cosine_similarity(feature_matrix)
-    distance = 1 - similarity
-    
-    distance = np.clip(distance, 0, None)
-    np.fill_diagonal(distance, 0)
-    
-    return distance
+    return squareform(calculate_distance_matrix_cosine_condensed(feature_matrix))
 
 
 def calculate_distance_matrix_euclidean(feature_matrix: np.ndarray) -> np.ndarray:
@@ -257,15 +583,16 @@ def calculate_distance_matrix_euclidean(feature_matrix: np.ndarray) -> np.ndarra
     """
     n_features = feature_matrix.shape[1]
     
-    condensed = pdist(feature_matrix, metric='euclidean')
-    distance = squareform(condensed)
+    # 二乗距離を求めてから同じ配列上で平方根・正規化する（一時配列を作らない）
+    condensed = pdist(feature_matrix, metric='sqeuclidean')
+    np.sqrt(condensed, out=condensed)
     
     # 正規化
     max_possible_distance = np.sqrt(n_features)
     if max_possible_distance > 0:
-        distance = distance / max_possible_distance
+        condensed /= max_possible_distance
     
-    return distance
+    return squareform(condensed)
 
 
 # ============================================================
@@ -273,32 +600,33 @@ def calculate_distance_matrix_euclidean(feature_matrix: np.ndarray) -> np.ndarra
 # ============================================================
 
 def save_head_initial_rates_csv(
-    all_language_data: Dict[str, List[Dict]],
+    all_language_data: Dict[str, LanguageData],
     output_path: Path,
     use_merged: bool = False,
-    min_occurrences: int = 10
+    min_occurrences: int = 10,
+    pair_counts: LanguagePairCounts = None
 ) -> None:
     """
     各言語のHead-Initial率をCSVとして保存
     
     Args:
-        all_language_data: {言語名: 文リスト}
+        all_language_data: {言語名: 文リスト または DependencyArrays}
         output_path: 出力CSVファイルパス
         use_merged: マージ後のカテゴリを使用するかどうか
         min_occurrences: 最低出現回数
+        pair_counts: compute_all_pair_counts の結果（Noneならここで集計）
     """
     languages = sorted(all_language_data.keys())
     
+    if pair_counts is None:
+        pair_counts = compute_all_pair_counts(all_language_data, use_merged=use_merged)
+    
     language_rates: Dict[str, Dict[PairKey, float]] = {}
     all_pairs: Set[PairKey] = set()
     
     for lang in languages:
-        pair_counts = extract_head_dependent_pairs(
-            all_language_data[lang],
-            use_merged=use_merged
-        )
         filtered_counts = {
-            k: v for k, v in pair_counts.items()
+            k: v for k, v in pair_counts[lang].items()
             if v[1] >= min_occurrences
         }
         rates = calculate_head_initial_rates(filtered_counts)
@@ -306,49 +634,23 @@ def save_head_initial_rates_csv(
         all_pairs.update(filtered_counts.keys())
     
     sorted_pairs = sorted(all_pairs)
+    pair_to_row = {pair: i for i, pair in enumerate(sorted_pairs)}
     
-    with open(output_path, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.writer(f)
-        
-        header = ['HeadUPOS', 'DepUPOS', 'DEPREL'] + languages
-        writer.writerow(header)
-        
-        for pair in sorted_pairs:
-            row = list(pair)
-            for lang in languages:
-                rate = language_rates[lang].get(pair, '')
-                if rate != '':
-                    row.append(f'{rate:.4f}')
-                else:
-                    row.append('')
-            writer.writerow(row)
+    # 出現しない（min_occurrences未満の）ペアは空欄にするため NaN で初期化
+    rate_matrix = np.full((len(sorted_pairs), len(languages)), np.nan)
+    for j, lang in enumerate(languages):
+        for pair, rate in language_rates[lang].items():
+            rate_matrix[pair_to_row[pair], j] = rate
     
-    print(f"  Head-Initial率CSV保存: {output_path.name}")
-
-
-def find_most_similar_pairs(
-    matrix: np.ndarray,
-    languages: List[str],
-    top_n: int = 10
-) -> List[Tuple[str, str, float]]:
-    """
-    最も類似している（距離が小さい）言語ペアを抽出
-    
-    Args:
-        matrix: 距離行列
-        languages: 言語名リスト
-        top_n: 上位何件を返すか
-    
-    Returns:
-        [(言語1, 言語2, 距離), ...] のリスト（距離昇順）
-    """
-    pairs = []
-    n = len(languages)
+    df = pd.DataFrame(rate_matrix, columns=languages)
+    df.insert(0, 'HeadUPOS', [pair[0] for pair in sorted_pairs])
+    df.insert(1, 'DepUPOS', [pair[1] for pair in sorted_pairs])
+    df.insert(2, 'DEPREL', [pair[2] for pair in sorted_pairs])
     
-    for i in range(n):
-        for j in range(i + 1, n):
-            pairs.append((languages[i], languages[j], matrix[i, j]))
+    # 改行コードは従来の csv.writer と同じ CRLF
+    df.to_csv(
+        output_path, index=False, float_format='%.4f', na_rep='',
+        encoding='utf-8', lineterminator='\r\n'
+    )
     
-    pairs.sort(key=lambda x: x[2])
-    
-    return pairs[:top_n]
+    print(f"  Head-Initial率CSV保存: {output_path.name}")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Head Direction分析のNumba実装
+
+Head-Dependentペアの集計ループをNumbaでネイティブコードにコンパイルします。
+入力は data_loader.encode_dependencies が作るSoA形式の整数配列です。
+"""
+
+import numpy as np
+
+from numba import njit
+
+
+@njit(cache=True, boundscheck=False)
+def count_pairs(upos, deprel, head_pos, upos_map, deprel_map, punct_id, n_upos, n_deprel):
+    """
+    Head-Dependentペアの出現回数とHead-Initial回数を集計
+
+    Args:
+        upos: マージ前UPOSのID配列（欠損は -1）
+        deprel: マージ前DEPRELのID配列（欠損は -1）
+        head_pos: Headトークンの添字（ROOTなどは -1）
+        upos_map: UPOSのID → ペアキーに使うID の対応表
+        deprel_map: DEPRELのID → ペアキーに使うID の対応表
+        punct_id: PUNCTのID（除外しない場合は -1）
+        n_upos: ペアキーのUPOS語彙サイズ
+        n_deprel: ペアキーのDEPREL語彙サイズ
+
+    Returns:
+        (head_initial_counts, total_counts)
+        どちらも (HeadUPOS, DepUPOS, DEPREL) を
+        (head * n_upos + dep) * n_deprel + deprel で平坦化したint64配列
+    """
+    size = n_upos * n_upos * n_deprel
+    init_counts = np.zeros(size, dtype=np.int64)
+    total_counts = np.zeros(size, dtype=np.int64)
+
+    for i in range(head_pos.shape[0]):
+        h = head_pos[i]
+        if h < 0:
+            continue
+
+        dep_upos = upos[i]
+        head_upos = upos[h]
+        dep_deprel = deprel[i]
+        if dep_upos < 0 or head_upos < 0 or dep_deprel < 0:
+            continue
+
+        if dep_upos == punct_id or head_upos == punct_id:
+            continue
+
+        key = (upos_map[head_upos] * n_upos + upos_map[dep_upos]) * n_deprel + deprel_map[dep_deprel]
+        total_counts[key] += 1
+        if h < i:
+            init_counts[key] += 1
+
+    return init_counts, total_counts
+
+
+@njit(cache=True, boundscheck=False)
+def count_pairs_raw_merged(
+    upos, deprel, head_pos, upos_map, deprel_map, punct_id,
+    n_upos, n_deprel, n_merged_upos, n_merged_deprel
+):
+    """
+    マージ前・マージ後の両方のペアを1回の走査で集計
+
+    Args:
+        upos, deprel, head_pos, punct_id: count_pairs と同じ
+        upos_map: マージ前UPOSのID → マージ後UPOSのID の対応表
+        deprel_map: マージ前DEPRELのID → マージ後DEPRELのID の対応表
+        n_upos, n_deprel: マージ前の語彙サイズ
+        n_merged_upos, n_merged_deprel: マージ後の語彙サイズ
+
+    Returns:
+        (raw_init, raw_total, merged_init, merged_total)
+        キーの平坦化は count_pairs と同じ
+    """
+    raw_init = np.zeros(n_upos * n_upos * n_deprel, dtype=np.int64)
+    raw_total = np.zeros(n_upos * n_upos * n_deprel, dtype=np.int64)
+    merged_init = np.zeros(n_merged_upos * n_merged_upos * n_merged_deprel, dtype=np.int64)
+    merged_total = np.zeros(n_merged_upos * n_merged_upos * n_merged_deprel, dtype=np.int64)
+
+    for i in range(head_pos.shape[0]):
+        h = head_pos[i]
+        if h < 0:
+            continue
+
+        dep_upos = upos[i]
+        head_upos = upos[h]
+        dep_deprel = deprel[i]
+        if dep_upos < 0 or head_upos < 0 or dep_deprel < 0:
+            continue
+
+        if dep_upos == punct_id or head_upos == punct_id:
+            continue
+
+        raw_key = (head_upos * n_upos + dep_upos) * n_deprel + dep_deprel
+        merged_key = (
+            (upos_map[head_upos] * n_merged_upos + upos_map[dep_upos]) * n_merged_deprel
+            + deprel_map[dep_deprel]
+        )
+        raw_total[raw_key] += 1
+        merged_total[merged_key] += 1
+        if h < i:
+            raw_init[raw_key] += 1
+            merged_init[merged_key] += 1
+
+    return raw_init, raw_total, merged_init, merged_total
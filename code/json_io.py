@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON入出力モジュール
+
+orjson（C実装）があればJSONのパース・シリアライズを高速化し、
+無ければ標準の json モジュールで同じ結果を返します。
+どちらの場合もバイト列（UTF-8）を入出力します。
+
+JSON Lines（1行に1つのJSON値）の読み書きもここで扱います。
+"""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: bytes) -> Any:
+    """
+    JSONのバイト列をパース
+
+    Args:
+        data: UTF-8のJSONバイト列
+
+    Returns:
+        パース結果
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    オブジェクトをJSONのバイト列にシリアライズ
+
+    Args:
+        obj: シリアライズするオブジェクト
+        indent: Trueなら2スペースでインデントする
+
+    Returns:
+        UTF-8のJSONバイト列（非ASCII文字はエスケープしない）
+    """
+    if orjson is not None:
+        # 標準の json と同じく、str 以外の辞書キー（int など）は文字列にして書く
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (',', ':')
+    ).encode('utf-8')
+
+
+def _dumps_line(obj: Any) -> bytes:
+    """
+    オブジェクトをJSON Linesの1行（末尾に改行付き）にシリアライズ
+
+    orjson では改行の付加もシリアライズと同時に行い、連結のコピーを作らない。
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return dumps(obj) + b'\n'
+
+
+def read_json(path: Path) -> Any:
+    """
+    JSONファイルをバイト列のまま読み込んでパース
+
+    テキストとしてデコードせず、ファイル全体を一度に読んでからパースする。
+
+    Args:
+        path: JSONファイルのパス（str も可）
+
+    Returns:
+        パース結果
+    """
+    return loads(Path(path).read_bytes())
+
+
+def write_json(path: Path, obj: Any, indent: bool = True) -> None:
+    """
+    オブジェクトをJSONファイルとして保存
+
+    Args:
+        path: 出力ファイルパス
+        obj: 保存するオブジェクト
+        indent: Trueなら2スペースでインデントする
+    """
+    with open(path, 'wb') as f:
+        f.write(dumps(obj, indent=indent))
+
+
+def write_jsonl(path: Path, header: Union[Any, Callable[[], Any]], rows: Iterable[Any]) -> int:
+    """
+    先頭行にヘッダ、以降の各行に1件ずつ値を書くJSON Linesファイルを保存
+
+    header に呼び出し可能オブジェクトを渡すと、全行を書き終えてから呼び出した結果をヘッダにする
+    （件数などが rows を最後まで処理するまで決まらない場合用）。その間、本文は一時ファイルに
+    逐次書き出すため、rows 全体をメモリに保持しない。
+
+    Args:
+        path: 出力ファイルパス
+        header: 先頭行に書く値（件数などのメタデータ）、またはそれを返す関数
+        rows: 2行目以降に書く値
+
+    Returns:
+        書き込んだ行数（ヘッダを除く）
+    """
+    count = 0
+    if not callable(header):
+        with open(path, 'wb') as f:
+            f.write(_dumps_line(header))
+            for row in rows:
+                f.write(_dumps_line(row))
+                count += 1
+        return count
+
+    with tempfile.TemporaryFile() as body:
+        for row in rows:
+            body.write(_dumps_line(row))
+            count += 1
+        body.seek(0)
+        with open(path, 'wb') as f:
+            f.write(_dumps_line(header()))
+            shutil.copyfileobj(body, f)
+    return count
+
+
+def iter_jsonl(path: Path) -> Iterator[Any]:
+    """
+    JSON Linesファイルを1行ずつパースして返す（ヘッダ行も含む）
+
+    ファイル全体をメモリに載せないため、大きなファイルも逐次処理できる。
+
+    Args:
+        path: JSON Linesファイルのパス
+
+    Yields:
+        各行のパース結果
+    """
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
@@ -5,16 +5,25 @@
 依存関係を利用して、トークンを句単位でグループ化します。
 """
 
-import json
+import argparse
 import os
+import traceback
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from pathlib import Path
+
+from json_io import iter_jsonl, write_jsonl
+from parse_conllu import RAW_DIR, collect_conllu_tasks
+from utils import get_deprel_base, iter_conllu_sentences
 
 # 句の核となりうる品詞（主要語）
 HEAD_POS = {'NOUN', 'VERB', 'ADJ', 'ADV', 'PROPN', 'PRON', 'NUM', 'DET', 'INTJ', 'X', 'SYM'}
 
 # 句から除外する依存関係ラベル（これら以外は基本的にマージする）
 # サブタイプ（:以降）は無視して判定します
-EXCLUDE_DEPRELS = {
+EXCLUDE_DEPRELS = frozenset({
     'root',         # 根
     'punct',        # 句読点（分離してもしなくても良いが、分離が一般的）
     
@@ -31,7 +40,7 @@ EXCLUDE_DEPRELS = {
     
     # --- その他 ---
     'vocative', 'dislocated', 'orphan', 'reparandum'
-}
+})
 
 def build_dependency_tree(tokens):
     """
@@ -55,42 +64,67 @@ def build_dependency_tree(tokens):
     return tree
 
 
-def get_phrase_members(token_id, tokens, tree, included):
+def build_token_index(tokens):
     """
-    トークンを核とする句のメンバーを再帰的に取得
+    トークンIDからトークンを引く辞書を構築
+    
+    Args:
+        tokens: トークンのリスト
+    
+    Returns:
+        dict: {token_id: token}（同じIDが複数あれば先頭のトークン）
+    """
+    token_by_id = {}
+    
+    for token in tokens:
+        token_by_id.setdefault(token.get('id'), token)
+    
+    return token_by_id
+
+
+def get_phrase_members(token_id, token_by_id, tree, included):
+    """
+    トークンを核とする句のメンバーを取得
+    
+    再帰呼び出しの代わりに明示的なスタックで子孫をたどる
+    （関数呼び出しのコストを省き、長い文での再帰上限も避ける）。
     
     Args:
         token_id: 核となるトークンのID
-        tokens: 全トークンのリスト
+        token_by_id: {token_id: token} の辞書（build_token_index で作成）
         tree: 依存関係ツリー
         included: 既に句に含まれたトークンIDのセット
     
     Returns:
-        list: 句に含まれるトークンIDのリスト
+        list: 句に含まれるトークンIDのリスト（深さ優先の行きがけ順）
     """
     members = [token_id]
     included.add(token_id)
     
-    # 子トークンをチェック
-    for child_id in tree.get(token_id, []):
+    # 子は逆順に積み、取り出す順を再帰版と同じ行きがけ順にする
+    stack = list(reversed(tree.get(token_id, [])))
+    
+    while stack:
+        child_id = stack.pop()
         if child_id in included:
             continue
-            
+        
         # トークンを取得
-        child_token = next((t for t in tokens if t.get('id') == child_id), None)
+        child_token = token_by_id.get(child_id)
         if not child_token:
             continue
         
         deprel = child_token.get('deprel', '')
-        # サブタイプ（:以降）を除去してベースタグを取得
-        deprel_base = deprel.split(':')[0] if deprel else ''
+        # サブタイプ（:以降）を除いたベースタグ
+        deprel_base = get_deprel_base(child_token)
         
         # 句に含める条件をチェック
         # nmod:poss（所有格）は親にマージすべきなので例外扱い
         if deprel_base not in EXCLUDE_DEPRELS or deprel == 'nmod:poss':
-            # 再帰的に子トークンの句メンバーも取得
-            child_members = get_phrase_members(child_id, tokens, tree, included)
-            members.extend(child_members)
+            members.append(child_id)
+            included.add(child_id)
+            # 子トークンの子孫も同じ条件でたどる
+            stack.extend(reversed(tree.get(child_id, [])))
     
     return members
 
@@ -111,15 +145,16 @@ def merge_to_phrases(sentence):
     
     # 依存関係ツリーを構築
     tree = build_dependency_tree(tokens)
+    token_by_id = build_token_index(tokens)
     
     phrases = []
     included = set()
     
     # 句作成のヘルパー関数
     def create_phrase(token_id, upos, token):
-        # 依存関係に基づいてメンバー候補を取得（再帰的）
+        # 依存関係に基づいてメンバー候補を取得（子孫をたどる）
         temp_included = included.copy()
-        members = get_phrase_members(token_id, tokens, tree, temp_included)
+        members = get_phrase_members(token_id, token_by_id, tree, temp_included)
         
         # メンバートークンをIDでソート
         members.sort()
@@ -156,9 +191,8 @@ def merge_to_phrases(sentence):
         for m_id in final_members:
             included.add(m_id)
         
-        # 句を構築
-        phrase_tokens = [t for t in tokens if t.get('id') in final_members]
-        phrase_tokens.sort(key=lambda t: t.get('id', 0))
+        # 句を構築（final_members はID順なので、そのまま引けば出現順になる）
+        phrase_tokens = [token_by_id[m_id] for m_id in final_members]
         
         return {
             'head_id': token_id,
@@ -181,7 +215,7 @@ def merge_to_phrases(sentence):
         
         upos = token.get('upos', '')
         deprel = token.get('deprel', '')
-        deprel_base = deprel.split(':')[0] if deprel else ''
+        deprel_base = get_deprel_base(token)
         
         # 独立性の判定: EXCLUDE_DEPRELSに含まれるか、rootである場合
         # ただしnmod:poss（所有格）は独立させず親にマージされるべき
@@ -226,60 +260,139 @@ def merge_to_phrases(sentence):
     return phrases
 
 
+def write_phrase_file(language, sentences, output_path):
+    """
+    文を1文ずつ句に変換し、句データのJSON Linesファイルとして保存
+    
+    Args:
+        language: 言語名
+        sentences: 文データのイテラブル（'tokens' キーを持つ辞書。1文ずつ読み込んだものでよい）
+        output_path: 出力JSON Linesファイルのパス（1行目がヘッダ、2行目以降が1行1文）
+    
+    Returns:
+        (文数, 句数)
+    """
+    totals = {'sentence_count': 0, 'total_phrases': 0, 'total_tokens': 0}
+    
+    def iter_phrase_sentences():
+        for sent in sentences:
+            phrases = merge_to_phrases(sent)
+            token_count = len(sent.get('tokens', []))
+            
+            # 元のトークンは各句の 'tokens' にすべて含まれ、processed の同じ sent_id からも
+            # 引けるため、ここでは重複して保存しない（出力サイズと書き込み時間がほぼ半分になる）
+            yield {
+                'sent_id': sent.get('sent_id', ''),
+                'text': sent.get('text', ''),
+                'phrases': phrases,
+                'phrase_count': len(phrases),
+                'token_count': token_count
+            }
+            
+            totals['sentence_count'] += 1
+            totals['total_phrases'] += len(phrases)
+            totals['total_tokens'] += token_count
+    
+    # ファイルに保存（読み込み側が1文ずつ処理できるよう1行1文で書く）。
+    # ヘッダの件数は全文を処理し終えるまで決まらないため、書き込み後に構築する
+    write_jsonl(output_path, lambda: {'language': language, **totals}, iter_phrase_sentences())
+    
+    return totals['sentence_count'], totals['total_phrases']
+
+
 def process_language_file(input_path, output_path):
     """
     言語ファイルを処理して句データを生成
     
     Args:
-        input_path: 入力JSONファイルのパス
-        output_path: 出力JSONファイルのパス
+        input_path: 入力JSON Linesファイルのパス（1行目がヘッダ、2行目以降が1行1文）
+        output_path: 出力JSON Linesファイルのパス
+    
+    Returns:
+        (文数, 句数)
+    """
+    lines = iter_jsonl(input_path)
+    header = next(lines, {})
+    
+    # 各文を句に変換（入力は1文ずつ読み込む）
+    sentence_count, total_phrases = write_phrase_file(
+        header.get('language', 'Unknown'), lines, output_path
+    )
+    
+    # 並列実行時に他のファイルのログと混ざらないよう、まとめて1回で出力する
+    print(
+        f"処理中: {input_path}\n"
+        f"  → {sentence_count}文、{total_phrases}句を生成\n"
+        f"  → 保存先: {output_path}"
+    )
+    
+    return sentence_count, total_phrases
+
+
+def conllu_to_phrases(conllu_path, language_name, output_path, max_sentences=None):
     """
-    print(f"処理中: {input_path}")
+    CoNLL-Uファイルから直接句データを生成（processed の JSON Lines を経由しない）
     
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    文は iter_conllu_sentences で1文ずつ読み、そのまま句に変換して書き出すため、
+    JSON Lines への書き出しと読み直しの往復が無くなる。出力は
+    parse_conllu → process_language_file の2段階と同じ内容になる。
     
-    language = data.get('language', 'Unknown')
-    sentences = data.get('sentences', [])
+    Args:
+        conllu_path: 入力CoNLL-Uファイルのパス
+        language_name: 言語名
+        output_path: 出力JSON Linesファイルのパス
+        max_sentences: 最大文数（Noneなら全文を処理）
     
-    # 各文を句に変換
-    phrase_sentences = []
-    total_phrases = 0
+    Returns:
+        (文数, 句数)
+    """
+    sentences = islice(iter_conllu_sentences(str(conllu_path)), max_sentences)
+    sentence_count, total_phrases = write_phrase_file(language_name, sentences, output_path)
     
-    for sent in sentences:
-        phrases = merge_to_phrases(sent)
-        
-        phrase_sent = {
-            'sent_id': sent.get('sent_id', ''),
-            'text': sent.get('text', ''),
-            'original_tokens': sent.get('tokens', []),
-            'phrases': phrases,
-            'phrase_count': len(phrases),
-            'token_count': len(sent.get('tokens', []))
-        }
-        
-        phrase_sentences.append(phrase_sent)
-        total_phrases += len(phrases)
-    
-    # 出力データを構築
-    output_data = {
-        'language': language,
-        'sentence_count': len(phrase_sentences),
-        'total_phrases': total_phrases,
-        'total_tokens': sum(s['token_count'] for s in phrase_sentences),
-        'sentences': phrase_sentences
-    }
-    
-    # ファイルに保存
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
-    
-    print(f"  → {len(phrase_sentences)}文、{total_phrases}句を生成")
-    print(f"  → 保存先: {output_path}")
+    # 並列実行時に他のファイルのログと混ざらないよう、まとめて1回で出力する
+    print(
+        f"処理中: {conllu_path}\n"
+        f"  → {sentence_count}文、{total_phrases}句を生成\n"
+        f"  → 保存先: {output_path}"
+    )
+    
+    return sentence_count, total_phrases
+
+
+def _run_isolated(func, *args):
+    """
+    ワーカープロセスで1ファイル分の句データ生成を実行
+    
+    1ファイルの失敗で他のファイルの処理が止まらないよう、例外はここで捕まえて返す。
+    
+    Args:
+        func: process_language_file または conllu_to_phrases
+        *args: func に渡す引数
+    
+    Returns:
+        (func の戻り値・エラー時はNone, エラー時はトレースバック文字列・成功時はNone)
+    """
+    try:
+        return func(*args), None
+    except Exception:
+        return None, traceback.format_exc()
+
+
+def parse_args():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(description="句へのマージ処理")
+    parser.add_argument(
+        "--from-conllu",
+        action="store_true",
+        help="data/processed を使わず、data/raw のCoNLL-Uファイルから直接句データを生成する"
+    )
+    return parser.parse_args()
 
 
 def main():
     """メイン処理"""
+    args = parse_args()
+    
     # ディレクトリパス
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     processed_dir = os.path.join(project_root, 'data', 'processed')
@@ -292,24 +405,50 @@ def main():
     print("句へのマージ処理を開始します")
     print("=" * 60)
     
-    # processedディレクトリ内の全JSONファイルを処理
-    processed_files = sorted([f for f in os.listdir(processed_dir) if f.endswith('.json')])
-    
-    if not processed_files:
-        print("警告: 処理対象のファイルが見つかりません")
-        return
-    
-    for filename in processed_files:
-        input_file = os.path.join(processed_dir, filename)
+    if args.from_conllu:
+        # CoNLL-Uから直接生成（出力ファイル名は parse_conllu と同じ規則で決める）
+        tasks = collect_conllu_tasks(RAW_DIR, Path(processed_dir))
+        if not tasks:
+            print("警告: 処理対象のファイルが見つかりません")
+            return
+        
+        input_files, language_names, max_sentences, processed_files = zip(*tasks)
+        output_files = [
+            os.path.join(phrases_dir, f'{processed_file.stem}_phrases.jsonl')
+            for processed_file in processed_files
+        ]
+        worker = partial(_run_isolated, conllu_to_phrases)
+        worker_args = (input_files, language_names, output_files, max_sentences)
+    else:
+        # processedディレクトリ内の全JSONファイルを処理
+        processed_files = sorted([f for f in os.listdir(processed_dir) if f.endswith('.jsonl')])
         
-        # 出力ファイル名を決定（例: en_pud.json -> en_pud_phrases.json）
-        base_name = os.path.splitext(filename)[0]
-        output_file = os.path.join(phrases_dir, f'{base_name}_phrases.json')
+        if not processed_files:
+            print("警告: 処理対象のファイルが見つかりません")
+            return
         
-        process_language_file(input_file, output_file)
+        input_files = []
+        output_files = []
+        for filename in processed_files:
+            input_files.append(os.path.join(processed_dir, filename))
+            
+            # 出力ファイル名を決定（例: en_pud.jsonl -> en_pud_phrases.jsonl）
+            base_name = os.path.splitext(filename)[0]
+            output_files.append(os.path.join(phrases_dir, f'{base_name}_phrases.jsonl'))
+        worker = partial(_run_isolated, process_language_file)
+        worker_args = (input_files, output_files)
+    
+    # ファイルごとの処理は独立しているため、プロセス並列で実行する
+    failed = 0
+    with ProcessPoolExecutor() as executor:
+        for input_file, (_, error) in zip(input_files, executor.map(worker, *worker_args)):
+            if error is not None:
+                failed += 1
+                print(f"  ✗ エラー: {input_file}")
+                print(error, end="")
     
     print("=" * 60)
-    print("処理完了!")
+    print("処理完了!" if failed == 0 else f"処理完了（{failed}ファイルでエラー）")
     print("=" * 60)
 
 
@@ -3,25 +3,61 @@
 """
 CoNLL-Uファイルパーススクリプト
 
-CoNLL-U形式のファイルを解析してJSON形式に変換します。
+CoNLL-U形式のファイルを解析してJSON Lines形式（1行1文）に変換します。
 data/raw/ 内の全言語ディレクトリを処理し、data/processed/ に出力します。
 """
 
-import json
+import traceback
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
+from json_io import write_jsonl
 from utils import parse_conllu_file
-from data_loader import get_language_name
+from data_loader import get_language_name, save_dependency_cache
 
 
-def process_conllu_files(
+# パスの設定
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RAW_DIR = PROJECT_ROOT / "data" / "raw"
+PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
+
+
+def _parse_and_dump(task: Tuple[Path, str, Optional[int], Path]) -> Tuple[int, Optional[str]]:
+    """
+    ワーカープロセスで1ファイルをパースしてJSON Linesに保存
+    
+    1行目にヘッダ（language, file_path, sentence_count）、2行目以降に1行1文を書く。
+    パース結果がメモリにあるうちに係り受けのSoAキャッシュも保存し、
+    Head Direction分析がJSON Linesを読み直さずに済むようにする。
+    
+    Args:
+        task: (CoNLL-Uファイル, 言語名, 最大文数, 出力ファイル)
+    
+    Returns:
+        (文数, エラー時はトレースバック文字列・成功時はNone)
+    """
+    conllu_file, language_name, max_sentences, output_file = task
+    
+    try:
+        data = parse_conllu_file(str(conllu_file), language_name, max_sentences)
+        sentences = data.pop("sentences")
+        write_jsonl(output_file, data, sentences)
+        save_dependency_cache(output_file, data["language"], sentences)
+        return data["sentence_count"], None
+    except Exception:
+        return 0, traceback.format_exc()
+
+
+def collect_conllu_tasks(
     raw_dir: Path,
     processed_dir: Path,
     max_sentences_non_pud: Optional[int] = 1000
-) -> Tuple[int, int]:
+) -> List[Tuple[Path, str, Optional[int], Path]]:
     """
-    CoNLL-Uファイルを処理してJSONに変換
+    data/raw 内のCoNLL-Uファイルから、出力ファイルごとの処理タスクを作成
+    
+    同じ出力ファイルになるCoNLL-Uファイルが複数ある場合は、最後のファイルだけを処理する。
     
     Args:
         raw_dir: 入力ディレクトリ（data/raw）
@@ -29,12 +65,11 @@ def process_conllu_files(
         max_sentences_non_pud: PUD以外の言語の最大文数（Noneなら全文）
     
     Returns:
-        (処理したファイル数, 総文数)
+        [(CoNLL-Uファイル, 言語名, 最大文数, 出力ファイル), ...]
     """
-    processed_dir.mkdir(parents=True, exist_ok=True)
-    
-    processed_count = 0
-    total_sentences = 0
+    # 出力ファイルごとのタスク（PUD以外は train/dev/test が同じ出力先になる）
+    # 並列実行で同じファイルを複数のワーカーが書き換えないよう、出力先ごとに1つに絞る
+    tasks_by_output: Dict[Path, Tuple[Path, str, Optional[int], Path]] = {}
     
     for lang_dir in sorted(raw_dir.iterdir()):
         if not lang_dir.is_dir():
@@ -50,18 +85,16 @@ def process_conllu_files(
             # 言語コードを抽出
             # 例: en_pud-ud-test.conllu -> en_pud
             # 例: af_afribooms-ud-test.conllu -> af
-            filename_parts = conllu_file.stem.split("-")
-            lang_part = filename_parts[0]  # en_pud や af_afribooms
+            lang_part = conllu_file.stem.partition("-")[0]  # en_pud や af_afribooms
             
             # 言語コードとサブセット名を分離
-            lang_parts = lang_part.split("_")
-            lang_code = lang_parts[0]  # en, af, ja など
+            lang_code = lang_part.partition("_")[0]  # en, af, ja など
             
             # PUDかどうかを判定
             is_pud = "pud" in lang_part.lower()
             
             # 出力ファイル名の決定
-            # PUDの場合: en_pud.json、その他: af.json
+            # PUDの場合: en_pud.jsonl、その他: af.jsonl
             if is_pud:
                 output_name = f"{lang_code}_pud"
                 max_sentences = None  # PUDは制限なし
@@ -70,52 +103,87 @@ def process_conllu_files(
                 max_sentences = max_sentences_non_pud  # 追加言語は制限あり
             
             language_name = get_language_name(lang_code)
+            output_file = processed_dir / f"{output_name}.jsonl"
             
+            # 逐次処理していた頃と同じく、同じ出力先では後のファイルを採用する
+            # 同じツリーバンクの train/dev/test が重なるのは通常なので、
+            # 別のツリーバンクが同じ出力先になった場合だけ警告する
+            previous = tasks_by_output.get(output_file)
+            if previous is not None and previous[0].stem.partition("-")[0] != lang_part:
+                print(
+                    f"⚠ {previous[0].name}: 出力先 {output_file.name} は "
+                    f"{conllu_file.name} で上書きされるためスキップします"
+                )
+            tasks_by_output[output_file] = (conllu_file, language_name, max_sentences, output_file)
+    
+    return list(tasks_by_output.values())
+
+
+def process_conllu_files(
+    raw_dir: Path,
+    processed_dir: Path,
+    max_sentences_non_pud: Optional[int] = 1000
+) -> Tuple[int, int]:
+    """
+    CoNLL-Uファイルを処理してJSON Linesに変換
+    
+    ファイルごとの処理は独立しているため、プロセス並列で実行する。
+    対象ファイルの選び方は collect_conllu_tasks を参照。
+    
+    Args:
+        raw_dir: 入力ディレクトリ（data/raw）
+        processed_dir: 出力ディレクトリ（data/processed）
+        max_sentences_non_pud: PUD以外の言語の最大文数（Noneなら全文）
+    
+    Returns:
+        (処理したファイル数, 総文数)
+    """
+    processed_dir.mkdir(parents=True, exist_ok=True)
+    
+    tasks = collect_conllu_tasks(raw_dir, processed_dir, max_sentences_non_pud)
+    
+    processed_count = 0
+    total_sentences = 0
+    
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(_parse_and_dump, tasks)
+        
+        # 結果はタスクの順に受け取り、ログもその順で出す
+        for (conllu_file, language_name, max_sentences, output_file), (sentence_count, error) in zip(tasks, results):
             print(f"\n処理中: {language_name} ({conllu_file.name})")
             
-            try:
-                data = parse_conllu_file(str(conllu_file), language_name, max_sentences)
-                
-                if max_sentences and data["sentence_count"] >= max_sentences:
-                    print(f"  ⚠ 最大{max_sentences}文に達したため、残りはスキップしました")
-                
-                output_file = processed_dir / f"{output_name}.json"
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                
-                processed_count += 1
-                total_sentences += data["sentence_count"]
-                
-                print(f"  ✓ 完了: {data['sentence_count']} 文を処理")
-                print(f"  出力: {output_file.name}")
-                
-            except Exception as e:
-                print(f"  ✗ エラー: {conllu_file.name} - {e}")
-                import traceback
-                traceback.print_exc()
+            if error is not None:
+                print(f"  ✗ エラー: {conllu_file.name}")
+                print(error, end="")
+                continue
+            
+            if max_sentences and sentence_count >= max_sentences:
+                print(f"  ⚠ 最大{max_sentences}文に達したため、残りはスキップしました")
+            
+            processed_count += 1
+            total_sentences += sentence_count
+            
+            print(f"  ✓ 完了: {sentence_count} 文を処理")
+            print(f"  出力: {output_file.name}")
     
     return processed_count, total_sentences
 
 
 def main():
     """メイン処理"""
-    project_root = Path(__file__).resolve().parent.parent
-    raw_dir = project_root / "data" / "raw"
-    processed_dir = project_root / "data" / "processed"
-    
     print("=" * 70)
     print("CoNLL-Uファイルの処理を開始します...")
     print("=" * 70)
     
     processed_count, total_sentences = process_conllu_files(
-        raw_dir, processed_dir, max_sentences_non_pud=1000
+        RAW_DIR, PROCESSED_DIR, max_sentences_non_pud=1000
     )
     
     print("\n" + "=" * 70)
     print(f"処理完了:")
     print(f"  - 処理した言語数: {processed_count}")
     print(f"  - 総文数: {total_sentences}")
-    print(f"  - 出力ディレクトリ: {processed_dir}")
+    print(f"  - 出力ディレクトリ: {PROCESSED_DIR}")
     print("=" * 70)
 
 
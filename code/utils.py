@@ -2,7 +2,9 @@
 CoNLL-U形式のファイルをパースしてJSON形式に変換するユーティリティ
 """
 
-from typing import Dict, List, Any, Optional
+import sys
+from itertools import islice
+from typing import Dict, Iterator, List, Any, Optional
 
 
 # ============================================================
@@ -170,6 +172,10 @@ DEPREL_MERGE: Dict[str, str] = {
 UPOS_MERGE_DEFAULT = 'OTHER'
 DEPREL_MERGE_DEFAULT = 'OTHER'
 
+# サブタイプ付きのDEPRELも含めた merge_deprel の結果（初出時に登録）
+# 実データに現れるタグは数十種類なので、分割せずに1回の辞書引きで済む
+_DEPREL_MERGE_CACHE: Dict[str, str] = {}
+
 
 def merge_upos(upos: str) -> str:
     """
@@ -213,9 +219,31 @@ def merge_deprel(deprel: str) -> str:
         >>> merge_deprel('case')
         'FUNCTION'
     """
-    # サブタイプを除去（例: nsubj:pass -> nsubj）
-    base_deprel = deprel.split(':')[0] if deprel else ''
-    return DEPREL_MERGE.get(base_deprel, DEPREL_MERGE_DEFAULT)
+    merged = _DEPREL_MERGE_CACHE.get(deprel)
+    if merged is None:
+        # サブタイプを除去（例: nsubj:pass -> nsubj）
+        base_deprel = deprel.partition(':')[0] if deprel else ''
+        merged = _DEPREL_MERGE_CACHE[deprel] = DEPREL_MERGE.get(base_deprel, DEPREL_MERGE_DEFAULT)
+    return merged
+
+
+def get_deprel_base(token: Dict[str, Any]) -> str:
+    """
+    トークンのサブタイプを除いたDEPREL（ベースタグ）を取得
+    
+    パース時に保存した 'deprel_base' を使い、無ければ（古い出力など）'deprel' から求める。
+    
+    Args:
+        token: トークンの辞書
+    
+    Returns:
+        ベースタグ（例: 'nsubj:pass' -> 'nsubj'、DEPRELが無ければ ''）
+    """
+    base = token.get('deprel_base')
+    if base is None:
+        deprel = token.get('deprel')
+        base = deprel.partition(':')[0] if deprel else ''
+    return base
 
 
 def parse_feats(feats_str: str) -> Dict[str, str]:
@@ -228,8 +256,8 @@ def parse_feats(feats_str: str) -> Dict[str, str]:
     
     feats = {}
     for feat in feats_str.split("|"):
-        if "=" in feat:
-            key, value = feat.split("=", 1)
+        key, sep, value = feat.partition("=")
+        if sep:
             feats[key] = value
     return feats
 
@@ -244,12 +272,9 @@ def parse_misc(misc_str: str) -> Dict[str, str]:
     
     misc = {}
     for item in misc_str.split("|"):
-        if "=" in item:
-            key, value = item.split("=", 1)
-            misc[key] = value
-        else:
-            # キーのみの場合
-            misc[item] = "Yes"
+        key, sep, value = item.partition("=")
+        # キーのみの場合は "Yes"
+        misc[key] = value if sep else "Yes"
     return misc
 
 
@@ -265,66 +290,76 @@ def parse_token_line(line: str) -> Optional[Dict[str, Any]]:
     if len(fields) != 10:
         return None
     
+    # 10列を一度に取り出し、以降は添字アクセスをしない
+    token_id, form, lemma, upos, xpos, feats, head, deprel, deps, misc = fields
+    
     # マルチワードトークン(1-2のような形式)やempty nodeは無視
-    token_id = fields[0]
     if "-" in token_id or "." in token_id:
         return None
     
+    # UPOS/DEPRELは少数の値が大量に繰り返されるため、インターンして同じ文字列オブジェクトを共有する
+    # （トークンごとの文字列のメモリを省き、辞書引きでの比較も参照の一致で済む）
+    upos = sys.intern(upos)
+    if deprel == "_":
+        deprel = None
+    deprel_base = None
+    if deprel:
+        deprel = sys.intern(deprel)
+        deprel_base = sys.intern(deprel.partition(":")[0])
+    
     try:
         return {
-            "id": int(fields[0]),
-            "form": fields[1],
-            "lemma": fields[2],
-            "upos": fields[3],
-            "xpos": fields[4] if fields[4] != "_" else None,
-            "feats": parse_feats(fields[5]),
-            "head": int(fields[6]) if fields[6] != "_" else 0,
-            "deprel": fields[7] if fields[7] != "_" else None,
-            "deps": fields[8] if fields[8] != "_" else None,
-            "misc": parse_misc(fields[9])
+            "id": int(token_id),
+            "form": form,
+            "lemma": lemma,
+            "upos": upos,
+            "xpos": xpos if xpos != "_" else None,
+            # FEATS/MISC は分析で使わないため文字列のまま保存する（必要なら parse_feats / parse_misc で辞書に変換）
+            "feats": feats if feats != "_" else None,
+            "head": int(head) if head != "_" else 0,
+            "deprel": deprel,
+            # サブタイプを除いたベースタグ（分析のたびに分割しなくて済むよう保存しておく）
+            "deprel_base": deprel_base,
+            "deps": deps if deps != "_" else None,
+            "misc": misc if misc != "_" else None
         }
     except (ValueError, IndexError) as e:
         print(f"Warning: トークン行のパースエラー: {line[:50]}... - {e}")
         return None
 
 
-def parse_conllu_file(
-    file_path: str, 
-    language_name: str, 
-    max_sentences: Optional[int] = None
-) -> Dict[str, Any]:
+# CoNLL-Uファイル読み込み時のバッファサイズ（1 MiB）
+CONLLU_READ_BUFFER = 1024 * 1024
+
+
+def iter_conllu_sentences(file_path: str) -> Iterator[Dict[str, Any]]:
     """
-    CoNLL-Uファイルをパースして構造化データに変換
+    CoNLL-Uファイルを1文ずつパースして返すジェネレータ
+    
+    必要な文数だけ取り出せば残りの行は読まない。
+    sent_id を持たない文とトークンの無い文は返さない。
     
     Args:
         file_path: CoNLL-Uファイルのパス
-        language_name: 言語名
-        max_sentences: 最大文数（Noneなら全文を処理）
     
-    Returns:
-        パース結果の辞書
+    Yields:
+        文データ（sent_id, text, metadata, tokens）
     """
-    sentences = []
     current_sentence = None
     current_tokens = []
-    current_metadata = {}
     
-    with open(file_path, 'r', encoding='utf-8') as f:
+    # テキストモードのまま大きめのバッファで読む（デコードはバッファ単位でまとめて行われる）
+    with open(file_path, 'r', encoding='utf-8', buffering=CONLLU_READ_BUFFER) as f:
         for line in f:
             line = line.rstrip('\n')
             
-            # 最大文数に達したら終了
-            if max_sentences is not None and len(sentences) >= max_sentences:
-                break
-            
             # 空行は文の区切り
             if not line.strip():
                 if current_sentence is not None and current_tokens:
                     current_sentence["tokens"] = current_tokens
-                    sentences.append(current_sentence)
+                    yield current_sentence
                     current_sentence = None
                     current_tokens = []
-                    current_metadata = {}
                 continue
             
             # コメント行(メタデータ)
@@ -334,13 +369,12 @@ def parse_conllu_file(
                     key, value = line[1:].split("=", 1)
                     key = key.strip()
                     value = value.strip()
-                    current_metadata[key] = value
                     
                     # 新しい文の開始
                     if key == "sent_id":
                         if current_sentence is not None and current_tokens:
                             current_sentence["tokens"] = current_tokens
-                            sentences.append(current_sentence)
+                            yield current_sentence
                         
                         current_sentence = {
                             "sent_id": value,
@@ -358,12 +392,31 @@ def parse_conllu_file(
             token = parse_token_line(line)
             if token is not None:
                 current_tokens.append(token)
-        
-        # ファイル末尾の文を処理
-        if current_sentence is not None and current_tokens:
-            if max_sentences is None or len(sentences) < max_sentences:
-                current_sentence["tokens"] = current_tokens
-                sentences.append(current_sentence)
+    
+    # ファイル末尾の文を処理
+    if current_sentence is not None and current_tokens:
+        current_sentence["tokens"] = current_tokens
+        yield current_sentence
+
+
+def parse_conllu_file(
+    file_path: str, 
+    language_name: str, 
+    max_sentences: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    CoNLL-Uファイルをパースして構造化データに変換
+    
+    Args:
+        file_path: CoNLL-Uファイルのパス
+        language_name: 言語名
+        max_sentences: 最大文数（Noneなら全文を処理）
+    
+    Returns:
+        パース結果の辞書
+    """
+    # 最大文数に達したら、残りの行は読まずに終了する
+    sentences = list(islice(iter_conllu_sentences(file_path), max_sentences))
     
     return {
         "language": language_name,
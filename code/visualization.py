@@ -12,17 +12,46 @@
 """
 
 import csv
+import os
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
 
 import matplotlib
 matplotlib.use('Agg')  # GUIなしで使用
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.cluster.hierarchy import dendrogram, linkage
-from scipy.spatial.distance import squareform
-from sklearn.manifold import MDS, TSNE
+from matplotlib.figure import Figure
+
+# pyplot を介さず Figure を直接生成するため、各プロット関数はスレッドから並列に呼べる
+
+# パスの簡略化を最大にして描画を軽くする
+matplotlib.rcParams['path.simplify_threshold'] = 1.0
+
+# 出力画像の解像度（探索的な確認用途には150dpiで十分）
+# 環境変数 HIRES=1 を指定すると論文掲載用に300dpi・標準の圧縮率で保存する
+HIRES = os.environ.get('HIRES') == '1'
+DEFAULT_DPI = 300 if HIRES else 150
+
+# PNGの圧縮レベル（低いほど保存が速く、ファイルは大きくなる）
+SAVEFIG_PIL_KWARGS = {} if HIRES else {'compress_level': 1}
+
+# ヒートマップのセルに数値を書き込む最大言語数（超えるとセル数の2乗でTextが増え描画が遅くなる）
+HEATMAP_ANNOT_MAX = 15
+
+# scipy / sklearn は読み込みが重いため、使用する関数内でインポートする
+
+
+def _save(fig: Figure, output_path: Path) -> None:
+    """
+    図をPNGとして保存（解像度・圧縮率はモジュール共通の設定を使う）
+    
+    Args:
+        fig: 保存する図
+        output_path: 出力ファイルパス
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(output_path, dpi=DEFAULT_DPI, pil_kwargs=SAVEFIG_PIL_KWARGS)
 
 
 # ============================================================
@@ -46,32 +75,46 @@ def plot_heatmap(
         title: グラフタイトル
         output_path: 出力ファイルパス
         cmap: カラーマップ
-        fmt: 数値フォーマット
+        fmt: 数値フォーマット（言語数が HEATMAP_ANNOT_MAX 以下のときのみ数値を表示）
     """
-    plt.figure(figsize=(14, 12))
-    
-    ax = sns.heatmap(
-        matrix,
-        xticklabels=languages,
-        yticklabels=languages,
-        cmap=cmap,
-        annot=True,
-        fmt=fmt,
-        square=True,
-        cbar_kws={'label': 'Distance'},
-        linewidths=0.5
-    )
-    
-    plt.title(title, fontsize=16, pad=20)
-    plt.xlabel('Language', fontsize=12)
-    plt.ylabel('Language', fontsize=12)
-    plt.xticks(rotation=45, ha='right')
-    plt.yticks(rotation=0)
-    plt.tight_layout()
-    
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    n = len(languages)
+    vmax = float(matrix.max()) if matrix.size else 1.0
+    
+    fig = Figure(figsize=(14, 12))
+    ax = fig.subplots()
+    
+    im = ax.imshow(matrix, cmap=cmap, vmin=0, vmax=vmax)
+    fig.colorbar(im, ax=ax, label='Distance')
+    
+    ax.set_xticks(np.arange(n))
+    ax.set_yticks(np.arange(n))
+    ax.set_xticklabels(languages, rotation=45, ha='right')
+    ax.set_yticklabels(languages, rotation=0)
+    
+    # セルの境界線（sns.heatmap の linewidths 相当）
+    ax.set_xticks(np.arange(n + 1) - 0.5, minor=True)
+    ax.set_yticks(np.arange(n + 1) - 0.5, minor=True)
+    ax.grid(which='minor', color='white', linewidth=0.5)
+    ax.tick_params(which='minor', length=0)
+    
+    if n <= HEATMAP_ANNOT_MAX:
+        # 濃いセルでは白文字にして数値を読みやすくする
+        threshold = vmax / 2
+        for i in range(n):
+            for j in range(n):
+                value = matrix[i, j]
+                ax.text(
+                    j, i, format(value, fmt),
+                    ha='center', va='center', fontsize=8,
+                    color='white' if value > threshold else 'black'
+                )
+    
+    ax.set_title(title, fontsize=16, pad=20)
+    ax.set_xlabel('Language', fontsize=12)
+    ax.set_ylabel('Language', fontsize=12)
+    fig.tight_layout()
+    
+    _save(fig, output_path)
     
     print(f"  ヒートマップ保存: {output_path.name}")
 
@@ -80,13 +123,59 @@ def plot_heatmap(
 # 樹形図（デンドログラム）
 # ============================================================
 
+@lru_cache(maxsize=32)
+def _cached_linkage(matrix_bytes: bytes, shape: Tuple[int, ...], method: str) -> np.ndarray:
+    """
+    距離行列のバイト列をキーにした linkage のメモ化
+    
+    fastcluster（C++実装、全手法で O(N^2)）があれば使い、無ければ scipy で計算する。
+    """
+    from scipy.spatial.distance import squareform
+    
+    matrix = np.frombuffer(matrix_bytes, dtype=np.float64).reshape(shape)
+    # 凝縮形式（1次元）ならそのまま使う
+    condensed = matrix if matrix.ndim == 1 else squareform(matrix)
+    
+    try:
+        import fastcluster
+    except ImportError:
+        fastcluster = None
+    
+    if fastcluster is not None:
+        linkage_matrix = fastcluster.linkage(condensed, method=method)
+    else:
+        from scipy.cluster.hierarchy import linkage
+        # optimal_ordering は計算量が大きいため使わない
+        linkage_matrix = linkage(condensed, method=method, optimal_ordering=False)
+    linkage_matrix.setflags(write=False)  # キャッシュを共有するため読み取り専用
+    return linkage_matrix
+
+
+def compute_linkage(matrix: np.ndarray, method: str = 'average') -> np.ndarray:
+    """
+    距離行列から階層的クラスタリングの linkage 行列を計算
+    
+    同じ距離行列・手法での再計算はキャッシュから返す。
+    
+    Args:
+        matrix: 距離行列（対称・対角0）、または凝縮形式の距離ベクトル
+        method: クラスタリング手法（'average', 'ward', 'complete', 'single'）
+    
+    Returns:
+        linkage 行列（読み取り専用）
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+    return _cached_linkage(matrix.tobytes(), matrix.shape, method)
+
+
 def plot_dendrogram(
     matrix: np.ndarray,
     languages: List[str],
     title: str,
     output_path: Path,
     method: str = 'average',
-    color_threshold_ratio: float = 0.7
+    color_threshold_ratio: float = 0.7,
+    condensed: np.ndarray = None
 ) -> None:
     """
     距離行列から樹形図を作成
@@ -98,75 +187,180 @@ def plot_dendrogram(
         output_path: 出力ファイルパス
         method: クラスタリング手法（'average', 'ward', 'complete', 'single'）
         color_threshold_ratio: 色分けの閾値（最大距離に対する比率）
+        condensed: 凝縮形式の距離（指定時は matrix からの変換を省略）
     """
-    plt.figure(figsize=(12, 8))
+    from scipy.cluster.hierarchy import dendrogram
     
-    # 距離行列を凝縮形式に変換
-    condensed = squareform(matrix)
+    fig = Figure(figsize=(12, 8))
+    ax = fig.subplots()
     
     # 階層的クラスタリング
-    linkage_matrix = linkage(condensed, method=method)
+    linkage_matrix = compute_linkage(
+        condensed if condensed is not None else matrix, method=method
+    )
     
     # 樹形図描画
     dendrogram(
         linkage_matrix,
         labels=languages,
         leaf_font_size=10,
-        color_threshold=color_threshold_ratio * max(linkage_matrix[:, 2])
+        color_threshold=color_threshold_ratio * max(linkage_matrix[:, 2]),
+        ax=ax
     )
     
-    plt.title(title, fontsize=16, pad=20)
-    plt.xlabel('Language', fontsize=12)
-    plt.ylabel('Distance', fontsize=12)
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
+    ax.set_title(title, fontsize=16, pad=20)
+    ax.set_xlabel('Language', fontsize=12)
+    ax.set_ylabel('Distance', fontsize=12)
+    ax.tick_params(axis='x', labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+    fig.tight_layout()
     
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    _save(fig, output_path)
     
     print(f"  樹形図保存: {output_path.name}")
 
 
 # ============================================================
-# MDS散布図
+# 散布図（MDS / t-SNE）
 # ============================================================
 
-def plot_mds(
-    matrix: np.ndarray,
+def _classical_mds_init(matrix: np.ndarray, n_components: int = 2) -> np.ndarray:
+    """
+    古典的MDS（Torgerson法）による2次元座標（SMACOFの初期値に使う）
+    
+    二重中心化した -D^2/2 の固有値分解1回で求まり、ランダムな初期値より
+    収束が速く、初期化の繰り返しも要らない。
+    """
+    n = matrix.shape[0]
+    # B = -1/2 * J D^2 J（J = I - 1/n の中心化行列）
+    centering = np.eye(n) - 1.0 / n
+    b = -0.5 * centering @ (matrix ** 2) @ centering
+    
+    # 言語数程度の小さな対称行列なので密な固有値分解で十分（固有値は昇順）
+    eigvals, eigvecs = np.linalg.eigh(b)
+    top = np.argsort(eigvals)[::-1][:n_components]
+    return eigvecs[:, top] * np.sqrt(np.clip(eigvals[top], 0, None))
+
+
+@lru_cache(maxsize=32)
+def _cached_mds(matrix_bytes: bytes, shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    距離行列のバイト列をキーにした MDS 埋め込みのメモ化
+    """
+    from sklearn.manifold import MDS
+    
+    matrix = np.frombuffer(matrix_bytes, dtype=np.float64).reshape(shape)
+    
+    # 古典的MDSの解から始めるため、初期化の繰り返しは不要（n_init=1）
+    mds = MDS(
+        n_components=2,
+        dissimilarity='precomputed',
+        random_state=42,
+        n_init=1,
+        max_iter=100,
+        n_jobs=-1,
+        normalized_stress='auto'
+    )
+    coords = mds.fit_transform(matrix, init=_classical_mds_init(matrix))
+    coords.setflags(write=False)  # キャッシュを共有するため読み取り専用
+    return coords
+
+
+def compute_mds(matrix: np.ndarray) -> np.ndarray:
+    """
+    MDS（多次元尺度構成法）で距離行列を2次元に埋め込む
+    
+    同じ距離行列での再計算はキャッシュから返す。
+    
+    Args:
+        matrix: 距離行列
+    
+    Returns:
+        2次元座標 (言語数 x 2)（読み取り専用）
+    
+    【MDSについて】
+    高次元の距離関係を低次元（ここでは2次元）に射影する手法。
+    元の距離関係をできるだけ保持しながら可視化できる。
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+    return _cached_mds(matrix.tobytes(), matrix.shape)
+
+
+@lru_cache(maxsize=32)
+def _cached_tsne(matrix_bytes: bytes, shape: Tuple[int, ...], perplexity: int) -> np.ndarray:
+    """
+    距離行列のバイト列をキーにした t-SNE 埋め込みのメモ化
+    """
+    from sklearn.manifold import TSNE
+    
+    matrix = np.frombuffer(matrix_bytes, dtype=np.float64).reshape(shape)
+    
+    tsne = TSNE(
+        n_components=2, 
+        perplexity=perplexity, 
+        random_state=42, 
+        metric='precomputed', 
+        init='random',
+        method='barnes_hut',
+        n_jobs=-1
+    )
+    coords = tsne.fit_transform(matrix)
+    coords.setflags(write=False)  # キャッシュを共有するため読み取り専用
+    return coords
+
+
+def compute_tsne(matrix: np.ndarray, perplexity: int = None) -> np.ndarray:
+    """
+    t-SNEで距離行列を2次元に埋め込む
+    
+    同じ距離行列・perplexityでの再計算はキャッシュから返す。
+    
+    Args:
+        matrix: 距離行列
+        perplexity: t-SNEのperplexityパラメータ（Noneなら自動設定）
+    
+    Returns:
+        2次元座標 (言語数 x 2)（読み取り専用）
+    """
+    # perplexityは言語数より小さくする必要がある
+    if perplexity is None:
+        perplexity = min(5, matrix.shape[0] - 1)
+    
+    matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+    return _cached_tsne(matrix.tobytes(), matrix.shape, perplexity)
+
+
+def render_scatter(
+    coords: np.ndarray,
     languages: List[str],
     title: str,
     output_path: Path,
+    axis_label: str,
     point_size: int = 100,
-    point_color: str = 'steelblue'
+    point_color: str = None
 ) -> None:
     """
-    MDS（多次元尺度構成法）による2次元散布図を作成
+    2次元座標をラベル付き散布図として保存
     
     Args:
-        matrix: 距離行列
+        coords: 2次元座標 (言語数 x 2)
         languages: 言語名リスト
         title: グラフタイトル
         output_path: 出力ファイルパス
+        axis_label: 軸ラベルの接頭辞（例: 'MDS' -> 'MDS Dimension 1'）
         point_size: ポイントのサイズ
-        point_color: ポイントの色
-    
-    【MDSについて】
-    高次元の距離関係を低次元（ここでは2次元）に射影する手法。
-    元の距離関係をできるだけ保持しながら可視化できる。
+        point_color: ポイントの色（Noneならデフォルト色）
     """
-    plt.figure(figsize=(12, 10))
-    
-    # MDS による次元削減
-    mds = MDS(n_components=2, dissimilarity='precomputed', random_state=42, normalized_stress='auto')
-    coords = mds.fit_transform(matrix)
+    fig = Figure(figsize=(12, 10))
+    ax = fig.subplots()
     
     # プロット
-    plt.scatter(coords[:, 0], coords[:, 1], s=point_size, alpha=0.7, c=point_color)
+    ax.scatter(coords[:, 0], coords[:, 1], s=point_size, alpha=0.7, c=point_color)
     
     # ラベル
     for i, lang in enumerate(languages):
-        plt.annotate(
+        ax.annotate(
             lang,
             (coords[i, 0], coords[i, 1]),
             xytext=(5, 5),
@@ -174,22 +368,39 @@ def plot_mds(
             fontsize=10
         )
     
-    plt.title(title, fontsize=16, pad=20)
-    plt.xlabel('MDS Dimension 1', fontsize=12)
-    plt.ylabel('MDS Dimension 2', fontsize=12)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
+    ax.set_title(title, fontsize=16, pad=20)
+    ax.set_xlabel(f'{axis_label} Dimension 1', fontsize=12)
+    ax.set_ylabel(f'{axis_label} Dimension 2', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
     
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    _save(fig, output_path)
     
-    print(f"  MDS散布図保存: {output_path.name}")
+    print(f"  {axis_label}散布図保存: {output_path.name}")
 
 
-# ============================================================
-# t-SNE散布図
-# ============================================================
+def plot_mds(
+    matrix: np.ndarray,
+    languages: List[str],
+    title: str,
+    output_path: Path,
+    point_size: int = 100,
+    point_color: str = 'steelblue'
+) -> None:
+    """
+    MDS（多次元尺度構成法）による2次元散布図を作成
+    
+    Args:
+        matrix: 距離行列
+        languages: 言語名リスト
+        title: グラフタイトル
+        output_path: 出力ファイルパス
+        point_size: ポイントのサイズ
+        point_color: ポイントの色
+    """
+    coords = compute_mds(matrix)
+    render_scatter(coords, languages, title, output_path, 'MDS', point_size, point_color)
+
 
 def plot_tsne(
     matrix: np.ndarray,
@@ -210,45 +421,8 @@ def plot_tsne(
         perplexity: t-SNEのperplexityパラメータ（Noneなら自動設定）
         point_size: ポイントのサイズ
     """
-    plt.figure(figsize=(12, 10))
-    
-    # perplexityは言語数より小さくする必要がある
-    if perplexity is None:
-        perplexity = min(5, len(languages) - 1)
-    
-    tsne = TSNE(
-        n_components=2, 
-        perplexity=perplexity, 
-        random_state=42, 
-        metric='precomputed', 
-        init='random'
-    )
-    coords = tsne.fit_transform(matrix)
-    
-    # プロット
-    plt.scatter(coords[:, 0], coords[:, 1], s=point_size, alpha=0.7)
-    
-    # ラベル
-    for i, lang in enumerate(languages):
-        plt.annotate(
-            lang,
-            (coords[i, 0], coords[i, 1]),
-            xytext=(5, 5),
-            textcoords='offset points',
-            fontsize=10
-        )
-    
-    plt.title(title, fontsize=16, pad=20)
-    plt.xlabel('t-SNE Dimension 1', fontsize=12)
-    plt.ylabel('t-SNE Dimension 2', fontsize=12)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    print(f"  t-SNE散布図保存: {output_path.name}")
+    coords = compute_tsne(matrix, perplexity)
+    render_scatter(coords, languages, title, output_path, 't-SNE', point_size)
 
 
 # ============================================================
@@ -278,10 +452,9 @@ def save_distance_matrix_csv(
         # ヘッダー
         writer.writerow([''] + languages)
         
-        # データ行
-        for i, lang in enumerate(languages):
-            row = [lang] + [f'{x:.{precision}f}' for x in matrix[i]]
-            writer.writerow(row)
+        # データ行（数値はまとめて書式化し、言語名のクォートはヘッダーと同じ writer に任せる）
+        cells = np.char.mod(f'%.{precision}f', matrix)
+        writer.writerows([lang, *row] for lang, row in zip(languages, cells.tolist()))
     
     print(f"  距離行列CSV保存: {output_path.name}")
 
@@ -296,7 +469,8 @@ def visualize_distance_matrix(
     output_dir: Path,
     name_prefix: str,
     title_suffix: str = "",
-    include_tsne: bool = False
+    include_tsne: bool = False,
+    parallel: bool = True
 ) -> None:
     """
     距離行列の一括可視化を実行
@@ -310,40 +484,41 @@ def visualize_distance_matrix(
         name_prefix: ファイル名のプレフィックス
         title_suffix: タイトルのサフィックス
         include_tsne: t-SNE散布図も生成するか
+        parallel: 各出力をスレッドで並列に生成するか
     """
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # ヒートマップ
-    plot_heatmap(
-        matrix, languages,
-        f"Language Distance Heatmap{title_suffix}",
-        output_dir / f"{name_prefix}_heatmap.png"
-    )
-    
-    # 樹形図
-    plot_dendrogram(
-        matrix, languages,
-        f"Hierarchical Clustering{title_suffix}",
-        output_dir / f"{name_prefix}_dendrogram.png"
-    )
-    
-    # MDS散布図
-    plot_mds(
-        matrix, languages,
-        f"MDS Visualization{title_suffix}",
-        output_dir / f"{name_prefix}_mds.png"
-    )
+    tasks = [
+        # ヒートマップ
+        (plot_heatmap, f"Language Distance Heatmap{title_suffix}", f"{name_prefix}_heatmap.png"),
+        # 樹形図
+        (plot_dendrogram, f"Hierarchical Clustering{title_suffix}", f"{name_prefix}_dendrogram.png"),
+        # MDS散布図
+        (plot_mds, f"MDS Visualization{title_suffix}", f"{name_prefix}_mds.png"),
+    ]
     
     # t-SNE散布図（オプション）
     if include_tsne and len(languages) > 5:
-        plot_tsne(
-            matrix, languages,
-            f"t-SNE Visualization{title_suffix}",
-            output_dir / f"{name_prefix}_tsne.png"
-        )
+        tasks.append((plot_tsne, f"t-SNE Visualization{title_suffix}", f"{name_prefix}_tsne.png"))
     
     # CSV
-    save_distance_matrix_csv(
-        matrix, languages,
-        output_dir / f"{name_prefix}_distance.csv"
-    )
+    csv_path = output_dir / f"{name_prefix}_distance.csv"
+    
+    if not parallel:
+        for plot_func, title, filename in tasks:
+            plot_func(matrix, languages, title, output_dir / filename)
+        save_distance_matrix_csv(matrix, languages, csv_path)
+        return
+    
+    # 各出力は互いに独立で、各プロット関数は自前の Figure を使うためスレッドから呼べる
+    # （PNGエンコードやファイル書き込み、埋め込み計算の間はGILが解放される）
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(plot_func, matrix, languages, title, output_dir / filename)
+            for plot_func, title, filename in tasks
+        ]
+        futures.append(executor.submit(save_distance_matrix_csv, matrix, languages, csv_path))
+        
+        # 例外があればここで送出させる
+        for future in futures:
+            future.result()
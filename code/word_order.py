@@ -7,65 +7,128 @@
 """
 
 import csv
+import os
+from array import array
 import numpy as np
 from pathlib import Path
 from collections import Counter
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from cache import disk_cached
+from data_loader import PackedSentences, decode_tags
+
+# rapidfuzz（C拡張）があればビット並列アルゴリズムで高速に計算する
+try:
+    from rapidfuzz import process as _rf_process
+    from rapidfuzz.distance import Levenshtein as _rf_levenshtein
+except ImportError:
+    _rf_process = None
+    _rf_levenshtein = None
+
+# rapidfuzzが無い場合はNumba版のDPを使う（Numbaも無ければ純Python）
+try:
+    import word_order_numba as _lev_numba
+except ImportError:
+    _lev_numba = None
 
 
 # ============================================================
 # レーベンシュタイン距離
 # ============================================================
 
-def levenshtein_distance(seq1: List[str], seq2: List[str]) -> int:
+def levenshtein_distance(seq1: Sequence[str], seq2: Sequence[str]) -> int:
     """
     2つのシーケンス間のレーベンシュタイン距離を計算
     
     Args:
-        seq1: 文字列のリスト（例: ['DET', 'NOUN', 'VERB']）
-        seq2: 文字列のリスト
+        seq1: 文字列のリスト（例: ['DET', 'NOUN', 'VERB']）またはタグID列（bytes）
+        seq2: 文字列のリストまたはタグID列（bytes）
     
     Returns:
         編集距離（挿入・削除・置換の最小回数）
     """
-    m, n = len(seq1), len(seq2)
+    if _rf_levenshtein is not None:
+        return _rf_levenshtein.distance(seq1, seq2)
+    if _lev_numba is not None:
+        return _lev_numba.levenshtein_distance(seq1, seq2)
     
-    # DPテーブル
-    dp = [[0] * (n + 1) for _ in range(m + 1)]
+    return _levenshtein_distance_py(seq1, seq2)
+
+
+def _levenshtein_distance_py(seq1: Sequence[str], seq2: Sequence[str]) -> int:
+    """
+    純Pythonによるレーベンシュタイン距離（rapidfuzz未導入時のフォールバック）
+    """
+    # 内側のループ（列方向）が短い方になるように入れ替える
+    if len(seq1) < len(seq2):
+        seq1, seq2 = seq2, seq1
+    m, n = len(seq1), len(seq2)
     
-    for i in range(m + 1):
-        dp[i][0] = i
-    for j in range(n + 1):
-        dp[0][j] = j
+    # DPテーブルは直前の行と現在の行の2行だけ保持する
+    prev = array('i', range(n + 1))
+    curr = array('i', [0] * (n + 1))
     
     for i in range(1, m + 1):
+        curr[0] = i
+        item1 = seq1[i - 1]
         for j in range(1, n + 1):
-            if seq1[i - 1] == seq2[j - 1]:
-                dp[i][j] = dp[i - 1][j - 1]
+            if item1 == seq2[j - 1]:
+                curr[j] = prev[j - 1]
             else:
-                dp[i][j] = 1 + min(
-                    dp[i - 1][j],      # 削除
-                    dp[i][j - 1],      # 挿入
-                    dp[i - 1][j - 1]   # 置換
+                curr[j] = 1 + min(
+                    prev[j],       # 削除
+                    curr[j - 1],   # 挿入
+                    prev[j - 1]    # 置換
                 )
+        prev, curr = curr, prev
     
-    return dp[m][n]
+    return prev[n]
 
 
-def normalized_levenshtein(seq1: List[str], seq2: List[str]) -> float:
+def normalized_levenshtein(
+    seq1: Sequence[str],
+    seq2: Sequence[str],
+    score_cutoff: Optional[float] = None
+) -> float:
     """
     正規化レーベンシュタイン距離（0-1の範囲）
     
+    Args:
+        seq1: タグ列（bytes・ID配列・タグのリスト）
+        seq2: 同上
+        score_cutoff: 距離がこの値を超える場合は計算を打ち切り 1.0 を返す
+            （rapidfuzz の score_cutoff と同じ扱い。Noneなら打ち切らない）
+    
     Returns:
         0 = 完全一致, 1 = 完全に異なる
     """
-    if len(seq1) == 0 and len(seq2) == 0:
+    if _rf_levenshtein is not None:
+        return _rf_levenshtein.normalized_distance(seq1, seq2, score_cutoff=score_cutoff)
+    
+    len1, len2 = len(seq1), len(seq2)
+    max_len = max(len1, len2)
+    if max_len == 0:
         return 0.0
     
-    distance = levenshtein_distance(seq1, seq2)
-    max_len = max(len(seq1), len(seq2))
+    # 長さの差は編集距離の下限なので、それだけで閾値を超えるならDPは不要
+    if score_cutoff is not None and abs(len1 - len2) / max_len > score_cutoff:
+        return 1.0
+    
+    # 完全一致ならDPは不要（bytesの比較はmemcmp）
+    if len1 == len2:
+        if isinstance(seq1, np.ndarray) or isinstance(seq2, np.ndarray):
+            if np.array_equal(seq1, seq2):
+                return 0.0
+        elif seq1 == seq2:
+            return 0.0
     
-    return distance / max_len
+    distance = levenshtein_distance(seq1, seq2) / max_len
+    
+    if score_cutoff is not None and distance > score_cutoff:
+        return 1.0
+    return distance
 
 
 # ============================================================
@@ -89,53 +152,159 @@ def extract_ngrams(sequence: List[str], n: int) -> List[Tuple[str, ...]]:
     return [tuple(sequence[i:i+n]) for i in range(len(sequence) - n + 1)]
 
 
-def count_ngrams(sentences: List[List[str]], n: int) -> Counter:
+# n-gram集計時に文の区切りとして挟むID（data_loader.MAX_TAG_ID より大きい値）
+_SEPARATOR_ID = 255
+
+
+def _token_stream(sentences: PackedSentences) -> np.ndarray:
+    """
+    全文のタグIDを1本の配列にする（各文の末尾に _SEPARATOR_ID を挟む）
+    """
+    return np.insert(sentences.tokens, sentences.offsets[1:], _SEPARATOR_ID)
+
+
+def _count_ngram_ids(
+    stream: np.ndarray,
+    n: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    タグID列からn-gramをNumPyで一括カウント
+    
+    Args:
+        stream: _token_stream で作成したタグID列
+        n: n-gramのn
+    
+    Returns:
+        (ユニークなn-gram (k, n), 初出位置 (k,), 出現回数 (k,))
+    """
+    if len(stream) < n:
+        empty = np.zeros(0, dtype=np.intp)
+        return np.zeros((0, n), dtype=stream.dtype), empty, empty
+    
+    windows = np.lib.stride_tricks.sliding_window_view(stream, n)
+    # 文の区切りをまたぐn-gramを除外
+    windows = windows[~(windows == _SEPARATOR_ID).any(axis=1)]
+    
+    return np.unique(windows, axis=0, return_index=True, return_counts=True)
+
+
+def count_ngrams(sentences: PackedSentences, n: int) -> Counter:
     """
     複数文からn-gramをカウント
     
     Args:
-        sentences: 文のリスト（各文はUPOSタグのリスト）
+        sentences: 1言語分の文（タグIDにエンコード済み）
         n: n-gramのn
     
     Returns:
-        n-gramの出現回数カウンター
+        n-gramの出現回数カウンター（キーはタグのタプル）
     """
-    counter = Counter()
+    ngrams, first_index, counts = _count_ngram_ids(_token_stream(sentences), n)
     
-    for sentence in sentences:
-        ngrams = extract_ngrams(sentence, n)
-        counter.update(ngrams)
+    # 出現順に並べてCounterの挿入順（従来の実装）と揃える
+    counter = Counter()
+    for k in np.argsort(first_index, kind='stable'):
+        counter[decode_tags(ngrams[k])] = int(counts[k])
     
     return counter
 
 
+def _top_k_ngram_ids(
+    sentences: PackedSentences,
+    n: int,
+    top_k: int
+) -> List[Tuple[Tuple[int, ...], int]]:
+    """
+    出現回数上位k件のn-gramをID列のまま取得
+    
+    Counter.most_common と同じ順序（回数の降順、同数なら初出順）で返す。
+    """
+    ngrams, first_index, counts = _count_ngram_ids(_token_stream(sentences), n)
+    
+    # k番目の回数以上のものだけを候補にしてから並べ替える
+    candidates = np.arange(len(counts))
+    if len(counts) > top_k:
+        kth_count = np.partition(counts, -top_k)[-top_k]
+        candidates = np.flatnonzero(counts >= kth_count)
+    
+    order = candidates[np.lexsort((first_index[candidates], -counts[candidates]))][:top_k]
+    
+    return [(tuple(ngrams[k].tolist()), int(counts[k])) for k in order]
+
+
+def top_k_ngrams(
+    sentences: PackedSentences,
+    n: int,
+    top_k: int
+) -> List[Tuple[Tuple[str, ...], int]]:
+    """
+    出現回数上位k件のn-gramを取得
+    
+    タグへの復元は上位k件に対してのみ行う。
+    
+    Args:
+        sentences: 1言語分の文（タグIDにエンコード済み）
+        n: n-gramのn
+        top_k: 上位何件を返すか
+    
+    Returns:
+        [(ngram, count), ...]
+    """
+    return [(decode_tags(ids), count) for ids, count in _top_k_ngram_ids(sentences, n, top_k)]
+
+
+def _count_lang_ngrams(
+    language: str,
+    sentences: PackedSentences,
+    n: int,
+    top_k: int
+) -> Tuple[str, int, List[Tuple[Tuple[int, ...], int]]]:
+    """
+    1言語・1つのnについて上位n-gramを求める（ワーカープロセス用）
+    
+    ワーカー側ではタグの対応表を持たないため、ID列のまま返す。
+    """
+    return language, n, _top_k_ngram_ids(sentences, n, top_k)
+
+
+@disk_cached(lambda lang_sentences, n_values=[2, 3], top_k=20: f"n{'-'.join(map(str, n_values))}_top{top_k}")
 def analyze_ngrams_all_languages(
-    lang_sentences: Dict[str, List[List[str]]],
+    lang_sentences: Dict[str, PackedSentences],
     n_values: List[int] = [2, 3],
     top_k: int = 20
 ) -> Dict[str, Dict[int, List[Tuple]]]:
     """
     全言語のn-gram分析を実行
     
+    (言語, n) の組み合わせごとに独立しているため、プロセスプールで並列に処理する。
+    
     Args:
-        lang_sentences: {言語名: [文のリスト]}
+        lang_sentences: {言語名: PackedSentences}
         n_values: 分析するn-gramのサイズ
         top_k: 上位何件を保持するか
     
     Returns:
         {language: {n: [(ngram, count), ...]}}
-    """
-    results = {}
-    
-    for language, sentences in lang_sentences.items():
-        results[language] = {}
-        
-        for n in n_values:
-            counter = count_ngrams(sentences, n)
-            top_ngrams = counter.most_common(top_k)
-            results[language][n] = top_ngrams
     
-    return results
+    キーワード引数 cache_dir, cache_key を指定すると結果をディスクにキャッシュする
+    （cache.disk_cached を参照）。
+    """
+    top_ngrams: Dict[Tuple[str, int], List[Tuple]] = {}
+    
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [
+            executor.submit(_count_lang_ngrams, language, sentences, n, top_k)
+            for language, sentences in lang_sentences.items()
+            for n in n_values
+        ]
+        for future in as_completed(futures):
+            language, n, ngrams = future.result()
+            top_ngrams[(language, n)] = [(decode_tags(ids), count) for ids, count in ngrams]
+    
+    return {
+        language: {n: top_ngrams[(language, n)] for n in n_values}
+        for language in lang_sentences
+    }
 
 
 def save_ngram_results(
@@ -182,8 +351,19 @@ def save_ngram_results(
 # 言語間距離計算
 # ============================================================
 
+def _sentence_bytes(sentences: PackedSentences, n_sentences: int) -> List[bytes]:
+    """
+    先頭 n_sentences 文をそれぞれbytesとして取り出す
+    """
+    buffer = sentences.tokens.tobytes()
+    offsets = sentences.offsets.tolist()
+    return [buffer[offsets[k]:offsets[k + 1]] for k in range(n_sentences)]
+
+
+# 文ごとの距離をfloat64で集計するよう揃えた際、float32で集計した旧キャッシュを使わないようキーを変えている
+@disk_cached(lambda lang_sentences, sample_size=None: f"sample{sample_size}_f64")
 def calculate_pairwise_levenshtein(
-    lang_sentences: Dict[str, List[List[str]]],
+    lang_sentences: Dict[str, PackedSentences],
     sample_size: int = None
 ) -> Tuple[np.ndarray, List[str]]:
     """
@@ -192,11 +372,14 @@ def calculate_pairwise_levenshtein(
     PUDは同一内容のパラレルコーパスなので、同じインデックスの文同士を比較する。
     
     Args:
-        lang_sentences: {language: [[tag1, tag2, ...], ...]}
+        lang_sentences: {language: PackedSentences}
         sample_size: サンプリングする文数（Noneなら全文）
     
     Returns:
         (距離行列, 言語リスト)
+    
+    キーワード引数 cache_dir, cache_key を指定すると結果をディスクにキャッシュする
+    （cache.disk_cached を参照）。
     """
     languages = sorted(lang_sentences.keys())
     n_langs = len(languages)
@@ -209,25 +392,53 @@ def calculate_pairwise_levenshtein(
     
     print(f"  比較する文数: {min_sentences}")
     
+    # 各文をbytesに変換（rapidfuzzはbytesを高速パスで処理する）
+    encoded = [_sentence_bytes(lang_sentences[lang], min_sentences) for lang in languages]
+    
     distance_matrix = np.zeros((n_langs, n_langs))
     
-    for i, lang1 in enumerate(languages):
-        for j, lang2 in enumerate(languages):
-            if i >= j:
-                continue
-            
-            total_distance = 0.0
-            
-            for sent_idx in range(min_sentences):
-                seq1 = lang_sentences[lang1][sent_idx]
-                seq2 = lang_sentences[lang2][sent_idx]
-                
-                dist = normalized_levenshtein(seq1, seq2)
-                total_distance += dist
-            
-            avg_distance = total_distance / min_sentences
+    if _rf_process is not None:
+        # 言語ペアごとに、同じインデックスの文同士の距離を1回の呼び出しでまとめて計算
+        # （全文を1本に連結して1回で計算すると、整列がずれて文ごとの平均と一致しない）
+        for i, j in combinations(range(n_langs), 2):
+            distances = _rf_process.cpdist(
+                encoded[i], encoded[j],
+                scorer=_rf_levenshtein.normalized_distance,
+                workers=-1,
+                # 既定の float32 では文ごとの距離が丸められ、Numba版・Python版と結果がずれる
+                dtype=np.float64
+            )
+            avg_distance = distances.sum() / min_sentences
             distance_matrix[i, j] = avg_distance
             distance_matrix[j, i] = avg_distance  # 対称
+        
+        return distance_matrix, languages
+    
+    if _lev_numba is not None:
+        # 連結済みの配列をそのまま渡し、文インデックス方向を並列化
+        packed = [
+            (lang_sentences[lang].tokens, lang_sentences[lang].offsets)
+            for lang in languages
+        ]
+        for i, j in combinations(range(n_langs), 2):
+            avg_distance = _lev_numba.mean_normalized_levenshtein(
+                packed[i], packed[j], min_sentences
+            )
+            distance_matrix[i, j] = avg_distance
+            distance_matrix[j, i] = avg_distance  # 対称
+        
+        return distance_matrix, languages
+    
+    # 上三角（i < j）のペアのみを走査
+    for i, j in combinations(range(n_langs), 2):
+        total_distance = 0.0
+        
+        for seq1, seq2 in zip(encoded[i], encoded[j]):
+            total_distance += normalized_levenshtein(seq1, seq2)
+        
+        avg_distance = total_distance / min_sentences
+        distance_matrix[i, j] = avg_distance
+        distance_matrix[j, i] = avg_distance  # 対称
     
     return distance_matrix, languages
 
@@ -248,13 +459,18 @@ def find_most_similar_pairs(
     Returns:
         [(言語1, 言語2, 距離), ...]（距離昇順）
     """
-    pairs = []
-    n = len(languages)
-    
-    for i in range(n):
-        for j in range(i + 1, n):
-            pairs.append((languages[i], languages[j], matrix[i, j]))
-    
-    pairs.sort(key=lambda x: x[2])
-    
-    return pairs[:top_n]
+    # 上三角（i < j）の距離を1次元で取り出す（行優先で元のペア順と同じ）
+    rows, cols = np.triu_indices(len(languages), k=1)
+    distances = matrix[rows, cols]
+    
+    # 上位 top_n 件だけを部分選択してからソート（全件ソートを避ける）
+    if 0 < top_n < len(distances):
+        # top_n 番目の距離と同値のペアも候補に残し、同順位の選び方を安定ソートと揃える
+        kth = np.partition(distances, top_n - 1)[top_n - 1]
+        idx = np.flatnonzero(distances <= kth)
+    else:
+        idx = np.arange(len(distances))
+    # 同じ距離ならペアの出現順（安定ソートと同じ順序）
+    idx = idx[np.argsort(distances[idx], kind='stable')][:top_n]
+    
+    return [(languages[rows[k]], languages[cols[k]], float(distances[k])) for k in idx]
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+語順分析のNumba実装
+
+rapidfuzz が利用できない環境向けに、レーベンシュタイン距離のDPを
+Numbaでネイティブコードにコンパイルします。
+タグ列は整数ID配列（data_loader.encode_tags の出力など）として扱います。
+"""
+
+import numpy as np
+from typing import Dict, Sequence, Tuple
+
+from numba import get_num_threads, njit, prange
+
+
+# ============================================================
+# JITコンパイル済みカーネル
+# ============================================================
+
+@njit(cache=True, boundscheck=False)
+def lev_ij(a, b, buf):
+    """
+    2つのID配列間のレーベンシュタイン距離（2行ローリングDP）
+
+    Args:
+        a: ID配列
+        b: ID配列（内側のループになるため短い方を推奨）
+        buf: 作業用のint32配列（長さ 2 * (len(b) + 1) 以上）
+
+    Returns:
+        編集距離
+    """
+    m = a.shape[0]
+    n = b.shape[0]
+    prev = buf[:n + 1]
+    curr = buf[n + 1:2 * (n + 1)]
+
+    for j in range(n + 1):
+        prev[j] = j
+
+    for i in range(1, m + 1):
+        curr[0] = i
+        item1 = a[i - 1]
+        for j in range(1, n + 1):
+            if item1 == b[j - 1]:
+                curr[j] = prev[j - 1]
+            else:
+                best = prev[j]
+                if curr[j - 1] < best:
+                    best = curr[j - 1]
+                if prev[j - 1] < best:
+                    best = prev[j - 1]
+                curr[j] = best + 1
+        prev, curr = curr, prev
+
+    return prev[n]
+
+
+@njit(cache=True, boundscheck=False)
+def _normalized_ij(a, b, buf):
+    """
+    正規化レーベンシュタイン距離（作業バッファは呼び出し側で確保したものを使う）
+
+    Args:
+        a: ID配列
+        b: ID配列
+        buf: 作業用のint32配列（長さ 2 * (min(len(a), len(b)) + 1) 以上）
+    """
+    if a.shape[0] < b.shape[0]:
+        a, b = b, a
+    if a.shape[0] == 0:
+        return 0.0
+
+    return lev_ij(a, b, buf) / a.shape[0]
+
+
+@njit(cache=True, parallel=True)
+def _mean_normalized_distance(tokens1, offsets1, tokens2, offsets2, n_sentences, n_chunks):
+    """
+    同じインデックスの文同士の正規化距離の平均（文インデックスをチャンクに分けて並列化）
+
+    作業バッファはチャンクごとに1回だけ確保し、チャンク内の全ペアで使い回す。
+    """
+    # DPの内側（短い方の文）の最大長でバッファの大きさを決める
+    max_len = 0
+    for k in range(n_sentences):
+        inner = min(offsets1[k + 1] - offsets1[k], offsets2[k + 1] - offsets2[k])
+        if inner > max_len:
+            max_len = inner
+
+    chunk_size = (n_sentences + n_chunks - 1) // n_chunks
+    partial = np.zeros(n_chunks)
+
+    for c in prange(n_chunks):
+        buf = np.empty(2 * (max_len + 1), dtype=np.int32)
+        subtotal = 0.0
+        for k in range(c * chunk_size, min((c + 1) * chunk_size, n_sentences)):
+            a = tokens1[offsets1[k]:offsets1[k + 1]]
+            b = tokens2[offsets2[k]:offsets2[k + 1]]
+            subtotal += _normalized_ij(a, b, buf)
+        partial[c] = subtotal
+
+    return partial.sum() / n_sentences
+
+
+# ============================================================
+# Pythonラッパー
+# ============================================================
+
+# 文字列タグをIDに変換する際の対応表（呼び出し間で共有）
+_TAG_IDS: Dict[str, int] = {}
+
+
+def _as_ids(seq: Sequence) -> np.ndarray:
+    """
+    ID配列・bytes・タグのリストをint32のID配列に変換
+    """
+    if isinstance(seq, np.ndarray):
+        return seq.astype(np.int32, copy=False)
+    if isinstance(seq, (bytes, bytearray)):
+        return np.frombuffer(seq, dtype=np.uint8).astype(np.int32)
+
+    return np.array(
+        [_TAG_IDS.setdefault(tag, len(_TAG_IDS)) for tag in seq],
+        dtype=np.int32
+    )
+
+
+def levenshtein_distance(seq1: Sequence, seq2: Sequence) -> int:
+    """
+    2つのシーケンス間のレーベンシュタイン距離を計算
+
+    Args:
+        seq1: ID配列・bytes・タグのリストのいずれか
+        seq2: 同上
+
+    Returns:
+        編集距離
+    """
+    a, b = _as_ids(seq1), _as_ids(seq2)
+    if len(a) < len(b):
+        a, b = b, a
+
+    buf = np.empty(2 * (len(b) + 1), dtype=np.int32)
+    return int(lev_ij(a, b, buf))
+
+
+def mean_normalized_levenshtein(
+    packed1: Tuple[np.ndarray, np.ndarray],
+    packed2: Tuple[np.ndarray, np.ndarray],
+    n_sentences: int
+) -> float:
+    """
+    2言語間で、同じインデックスの文同士の正規化距離の平均を計算
+
+    Args:
+        packed1: (全文を連結したID配列, 各文の開始位置 (文数 + 1,))
+                 （PackedSentences の tokens, offsets）
+        packed2: 同上
+        n_sentences: 比較する文数
+
+    Returns:
+        平均正規化レーベンシュタイン距離
+    """
+    tokens1, offsets1 = packed1
+    tokens2, offsets2 = packed2
+    # スレッド数と同じ数のチャンクに分ける（作業バッファもチャンク数だけ確保される）
+    return float(_mean_normalized_distance(
+        tokens1, offsets1, tokens2, offsets2, n_sentences, get_num_threads()
+    ))